@@ -9,7 +9,7 @@ class AppConfig:
         self.config = JSONConfigParser()
         self.config.read_json(config_file_path)
 
-    def get(self, section: str, option: str):
+    def get(self, section: str, option: str, default=None):
         try:
             return self.config.get(section, option)
 
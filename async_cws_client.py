@@ -0,0 +1,224 @@
+import asyncio
+import re
+
+from requests.exceptions import RequestException
+
+from app_config import AppConfig
+from app_logger import AppLogger
+from async_http_session import AsyncHttpResponse, AsyncHttpSession
+from cws_data import PrePostagemQueryFilter
+from cws_token_manager import CwsTokenManager
+
+
+class AsyncCwsClient:
+    app_config: AppConfig
+    ambiente: str
+    app_logger: AppLogger
+    session: AsyncHttpSession
+    token_manager: CwsTokenManager
+
+    def __init__(self, app_config: AppConfig, ambiente: str, app_logger: AppLogger, token_manager: CwsTokenManager):
+        self.app_config = app_config
+        self.ambiente = ambiente
+        self.app_logger = app_logger
+        self.session = AsyncHttpSession(app_config, ambiente)
+        self.token_manager = token_manager
+
+    async def _request(self, method: str, url: str, **kwargs) -> AsyncHttpResponse:
+        # The session is shared by gathered coroutines, so the token stays per request
+        headers = kwargs.pop("headers", None) or {}
+
+        # The token manager may block on a refresh, keep it off the event loop
+        token = await asyncio.to_thread(self.token_manager.token)
+
+        response = await self.session.request(
+            method, url, headers={**headers, "Authorization": f"Bearer {token}"}, **kwargs
+        )
+
+        if response.status_code == 401:
+            token = await asyncio.to_thread(self.token_manager.refresh, token)
+
+            response = await self.session.request(
+                method, url, headers={**headers, "Authorization": f"Bearer {token}"}, **kwargs
+            )
+
+        return response
+
+    async def delete_prepostagem_v1_prepostagens_objeto(self, codigo_objeto: str) -> dict:
+        base_url = self.app_config.get(self.ambiente, "base_url")
+        usuario_meu_correios = self.app_config.get(
+            self.ambiente, "usuario_meu_correios"
+        )
+        url = f"{base_url}/prepostagem/v1/prepostagens/objeto/{codigo_objeto}?idCorreiosSolicitanteCancelamento={usuario_meu_correios}"
+
+        headers = {
+            "accept": "application/json",
+            "Content-Type": "application/json"
+        }
+
+        response = await self._request("DELETE", url, headers=headers, timeout=10)
+
+        self.app_logger.log_request_response(
+            response
+        )
+
+        if response.status_code == 200:
+            return response.json()
+
+        raise RequestException()
+
+    async def get_cep_v2_enderecos(self, cep: str) -> dict:
+        base_url = self.app_config.get(self.ambiente, "base_url")
+        cep_digits_only = ''.join(re.findall(r'\d', cep))
+        url = f"{base_url}/cep/v2/enderecos/{cep_digits_only}"
+
+        headers = {
+            "Accept": "application/json"
+        }
+
+        response = await self._request("GET", url, headers=headers, timeout=10)
+
+        if response.status_code == 200:
+            return response.json()
+
+        if response.status_code in (400, 404):
+            return None
+
+        raise RequestException()
+
+    async def get_meucontrato_v1_empresas_contratos_cartoes_servicos(self, page: int = 0, size: int = 200) -> dict:
+        base_url = self.app_config.get(self.ambiente, "base_url")
+        cnpj = self.app_config.get(self.ambiente, "cnpj")
+        numero_contrato = self.app_config.get(self.ambiente, "numero_contrato")
+        numero_cartao_postagem = self.app_config.get(
+            self.ambiente, "numero_cartao_postagem"
+        )
+        url = f"{base_url}/meucontrato/v1/empresas/{cnpj}/contratos/{numero_contrato}/cartoes/{numero_cartao_postagem}/servicos?page={page}&size={size}"
+
+        headers = {
+            "Accept": "application/json"
+        }
+
+        response = await self._request("GET", url, headers=headers, timeout=10)
+
+        if response.status_code == 200:
+            return response.json()
+
+        raise RequestException()
+
+    async def get_prepostagem_v1_prepostagens_declaracaoconteudo(self, id_pre_postagem: str) -> str:
+        base_url = self.app_config.get(self.ambiente, "base_url")
+        url = f"{base_url}/prepostagem/v1/prepostagens/declaracaoconteudo/{id_pre_postagem}"
+
+        headers = {
+            "Accept": "application/json, text/html, text/plain"
+        }
+
+        try:
+            response = await self._request("GET", url, headers=headers, timeout=10)
+
+            if response.status_code == 200:
+                return response.text
+
+            self.app_logger.log_request_response(
+                response
+            )
+
+            return ""
+
+        except RequestException:
+            return ""
+
+    async def get_prepostagem_v2_prepostagens(self, pre_postagem_query_filter: PrePostagemQueryFilter, page: int = 0, size: int = 100) -> dict:
+        base_url = self.app_config.get(self.ambiente, "base_url")
+        endpoint_url = f"{base_url}/prepostagem/v2/prepostagens?"
+
+        params = [
+            f"{key}={value}" for key, value in pre_postagem_query_filter.to_dict().items()
+        ]
+
+        params.append(f"page={page}")
+        params.append(f"size={size}")
+
+        url = endpoint_url + '&'.join(params)
+
+        headers = {
+            "Accept": "application/json"
+        }
+
+        response = await self._request("GET", url, headers=headers, timeout=10)
+
+        if response.status_code == 200:
+            return response.json()
+
+        raise RequestException()
+
+    async def post_prepostagem_v1_prepostagens(self, request_data: dict) -> dict:
+        base_url = self.app_config.get(self.ambiente, "base_url")
+        url = f"{base_url}/prepostagem/v1/prepostagens"
+
+        headers = {
+            "Accept": "application/json",
+            "Content-Type": "application/json"
+        }
+
+        response = await self._request(
+            "POST", url, headers=headers, json=request_data, timeout=10
+        )
+
+        self.app_logger.log_request_response(
+            response
+        )
+
+        if response.status_code == 200:
+            return response.json()
+
+        raise RequestException()
+
+    async def post_prepostagem_v1_prepostagens_rotulo_assincrono_pdf(self, codigo_objeto_list: list) -> dict:
+        base_url = self.app_config.get(self.ambiente, "base_url")
+        url = f"{base_url}/prepostagem/v1/prepostagens/rotulo/assincrono/pdf"
+
+        headers = {
+            "Accept": "*/*",
+            "Content-Type": "application/json"
+        }
+
+        numero_cartao_postagem = self.app_config.get(
+            self.ambiente, "numero_cartao_postagem"
+        )
+
+        request_data = {
+            "codigosObjeto": codigo_objeto_list,
+            "numeroCartaoPostagem": numero_cartao_postagem,
+            "tipoRotulo": "P",
+            "formatoRotulo": "ET",
+            "imprimeRemetente": "S"
+        }
+
+        response = await self._request(
+            "POST", url, headers=headers, json=request_data, timeout=10
+        )
+
+        if response.status_code == 200:
+            return response.json()
+
+    async def get_prepostagem_v1_prepostagens_rotulo_download_assincrono(self, id_recibo: str) -> dict:
+        base_url = self.app_config.get(self.ambiente, "base_url")
+        url = f"{base_url}/prepostagem/v1/prepostagens/rotulo/download/assincrono/{id_recibo}"
+
+        headers = {
+            "Accept": "*/*",
+            "Content-Type": "application/json"
+        }
+
+        try:
+            response = await self._request("GET", url, headers=headers, timeout=10)
+
+            if response.status_code == 200:
+                return response.json()
+
+            return ""
+
+        except RequestException:
+            return ""
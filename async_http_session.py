@@ -0,0 +1,196 @@
+import asyncio
+import atexit
+import json
+import time
+
+from dataclasses import dataclass
+from typing import Any, Coroutine, Dict, Optional
+
+import aiohttp
+
+from multidict import CIMultiDict
+from requests.exceptions import RequestException
+
+from app_config import AppConfig
+from circuit_breaker import CircuitBreaker, CircuitBreakerRegistry, circuit_breaker_registry
+from rate_limiter import RateLimiter, rate_limiter
+
+
+@dataclass
+class AsyncHttpRequest:
+    url: str
+    method: str
+    headers: dict
+    body: Optional[bytes]
+
+
+@dataclass
+class AsyncHttpResponse:
+    request: AsyncHttpRequest
+    status_code: int
+    headers: CIMultiDict
+    content: bytes
+
+    @property
+    def text(self) -> str:
+        return self.content.decode("utf-8")
+
+    def json(self) -> Any:
+        return json.loads(self.content) if self.content else None
+
+
+class AsyncConnectionPool:
+    event_loop: Optional[asyncio.AbstractEventLoop]
+    client_session_by_loop: Dict[asyncio.AbstractEventLoop, aiohttp.ClientSession]
+
+    def __init__(self):
+        self.event_loop = None
+        self.client_session_by_loop = {}
+
+    def get(self, app_config: AppConfig, section: str) -> aiohttp.ClientSession:
+        event_loop = asyncio.get_running_loop()
+
+        # A closed loop already tore down the transports of its session
+        for session_loop in [session_loop for session_loop in self.client_session_by_loop if session_loop.is_closed()]:
+            del self.client_session_by_loop[session_loop]
+
+        client_session = self.client_session_by_loop.get(event_loop)
+
+        # A session only works on the loop it was created on, e.g. each asyncio.run gets its own
+        if not client_session or client_session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=int(app_config.get(section, "async_pool_limit", 200)),
+                limit_per_host=int(
+                    app_config.get(section, "async_pool_limit_per_host", 50)
+                ),
+                keepalive_timeout=30
+            )
+
+            client_session = aiohttp.ClientSession(connector=connector)
+
+            self.client_session_by_loop[event_loop] = client_session
+
+        return client_session
+
+    def run(self, coroutine: Coroutine) -> Any:
+        # Created on first use, processes that stay synchronous never get one
+        if self.event_loop is None or self.event_loop.is_closed():
+            self.event_loop = asyncio.new_event_loop()
+
+        return self.event_loop.run_until_complete(coroutine)
+
+    def close(self) -> None:
+        client_session_by_loop = self.client_session_by_loop
+
+        self.client_session_by_loop = {}
+
+        # Each session is closed on its own loop, a closed or busy loop is left alone
+        for session_loop, client_session in client_session_by_loop.items():
+            if not client_session.closed and not session_loop.is_closed() and not session_loop.is_running():
+                session_loop.run_until_complete(client_session.close())
+
+        if self.event_loop is not None and not self.event_loop.is_closed():
+            self.event_loop.close()
+
+
+# One connection pool per event loop, shared by every async client; run() keeps
+# synchronous callers on a single loop so the pool survives between calls
+async_connection_pool = AsyncConnectionPool()
+
+atexit.register(async_connection_pool.close)
+
+
+class AsyncHttpSession:
+    app_config: AppConfig
+    section: str
+    headers: dict
+    circuit_breaker_registry: CircuitBreakerRegistry
+    rate_limiter: RateLimiter
+    max_throttled_retries: int
+
+    def __init__(self, app_config: AppConfig, section: str):
+        self.app_config = app_config
+        self.section = section
+        self.headers = {}
+        self.circuit_breaker_registry = circuit_breaker_registry
+        self.rate_limiter = rate_limiter
+        self.max_throttled_retries = int(
+            self.app_config.get(section, "max_retries", 3)
+        )
+
+    async def _send_request(self, circuit_breaker: CircuitBreaker, method: str, url: str, headers: dict, json_data: Optional[dict], timeout: float) -> AsyncHttpResponse:
+        client_session = async_connection_pool.get(
+            self.app_config, self.section
+        )
+
+        request_headers = {**self.headers, **(headers or {})}
+        body = None
+
+        if json_data is not None:
+            body = json.dumps(json_data).encode("utf-8")
+
+            request_headers.setdefault("Content-Type", "application/json")
+
+        if circuit_breaker:
+            circuit_breaker.before_call()
+
+        started_at = time.monotonic()
+        success = False
+
+        try:
+            async with client_session.request(method, url, headers=request_headers, data=body, timeout=aiohttp.ClientTimeout(total=timeout)) as response:
+                response = AsyncHttpResponse(
+                    request=AsyncHttpRequest(
+                        url, method, request_headers, body
+                    ),
+                    status_code=response.status,
+                    headers=CIMultiDict(response.headers),
+                    content=await response.read()
+                )
+
+            success = response.status_code < 500
+
+        except (aiohttp.ClientError, asyncio.TimeoutError) as error:
+            raise RequestException() from error
+
+        finally:
+            # Cancellation included, or a half-open probe slot is never given back
+            if circuit_breaker:
+                circuit_breaker.after_call(
+                    success, time.monotonic() - started_at
+                )
+
+        return response
+
+    async def request(self, method: str, url: str, headers: dict = None, json: dict = None, timeout: float = 10) -> AsyncHttpResponse:
+        bucket = self.rate_limiter.bucket(url, self.app_config, self.section)
+        circuit_breaker = self.circuit_breaker_registry.circuit_breaker(
+            url, self.app_config, self.section
+        )
+
+        for attempt in range(self.max_throttled_retries + 1):
+            if bucket:
+                await bucket.acquire_async()
+
+            response = await self._send_request(
+                circuit_breaker, method, url, headers, json, timeout
+            )
+
+            if response.status_code not in (429, 500, 502, 503, 504):
+                if bucket:
+                    bucket.on_success()
+
+                return response
+
+            if response.status_code == 429 and bucket:
+                bucket.on_throttled(
+                    self.rate_limiter.retry_after(
+                        response.headers.get("Retry-After")
+                    )
+                )
+            elif method != "GET":
+                return response
+            else:
+                await asyncio.sleep(0.5 * 2 ** attempt)
+
+        return response
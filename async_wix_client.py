@@ -0,0 +1,123 @@
+import json
+
+from requests.exceptions import RequestException
+
+from app_config import AppConfig
+from app_logger import AppLogger
+from async_http_session import AsyncHttpSession
+from wix_data import OrderFulfillment, OrderQueryFilter, OrderQuerySort
+
+
+class AsyncWixClient:
+    app_config: AppConfig
+    app_logger: AppLogger
+    session: AsyncHttpSession
+
+    def __init__(self, app_config: AppConfig, app_logger: AppLogger):
+        self.app_config = app_config
+        self.app_logger = app_logger
+        self.session = AsyncHttpSession(app_config, "DEFAULT")
+
+        self._add_headers(self.session.headers)
+
+    def _add_headers(self, headers: dict) -> None:
+        headers["Authorization"] = self.app_config.get(
+            "DEFAULT", "Authorization"
+        )
+        headers["wix-account-id"] = self.app_config.get(
+            "DEFAULT", "wix-account-id"
+        )
+        headers["wix-site-id"] = self.app_config.get(
+            "DEFAULT", "wix-site-id"
+        )
+
+    async def get_wix_data_v2_collections(self) -> dict:
+        base_url = self.app_config.get("DEFAULT", "base_url")
+        url = f"{base_url}/wix-data/v2/collections"
+
+        headers = {
+            "Accept": "application/json, text/plain, */*",
+            "Content-Type": "application/json"
+        }
+
+        response = await self.session.request("GET", url, headers=headers)
+
+        if response.status_code == 200:
+            return response.json()
+
+        raise RequestException()
+
+    async def delete_stores_v2_orders_fulfillments(self, order_id: str, fulfillment_id: str) -> dict:
+        base_url = self.app_config.get("DEFAULT", "base_url")
+        url = f"{base_url}/stores/v2/orders/{order_id}/fulfillments/{fulfillment_id}"
+
+        headers = {
+            "Accept": "application/json, text/plain, */*",
+            "Content-Type": "application/json"
+        }
+
+        response = await self.session.request("DELETE", url, headers=headers)
+
+        if response.status_code == 200:
+            self.app_logger.log_request_response(
+                response
+            )
+
+            return response.json()
+
+        raise RequestException()
+
+    async def post_stores_v2_orders_fulfillments(self, order_id: str, order_fulfillment: OrderFulfillment) -> dict:
+        base_url = self.app_config.get("DEFAULT", "base_url")
+        url = f"{base_url}/stores/v2/orders/{order_id}/fulfillments"
+
+        headers = {
+            "Accept": "application/json, text/plain, */*",
+            "Content-Type": "application/json"
+        }
+
+        data = {
+            "fulfillment": order_fulfillment.to_dict()
+        }
+
+        response = await self.session.request(
+            "POST", url, headers=headers, json=data
+        )
+
+        if response.status_code == 200:
+            self.app_logger.log_request_response(
+                response
+            )
+
+            return response.json()
+
+        raise RequestException()
+
+    async def post_stores_v2_orders_query(self, order_query_filter: OrderQueryFilter, order_query_sort: OrderQuerySort = OrderQuerySort.NUMBER_ASC, limit: int = 100, offset: int = 0) -> dict:
+        base_url = self.app_config.get("DEFAULT", "base_url")
+        url = f"{base_url}/stores/v2/orders/query"
+
+        headers = {
+            "Accept": "application/json, text/plain, */*",
+            "Content-Type": "application/json"
+        }
+
+        data = {
+            "query": {
+                "filter": json.dumps(order_query_filter.to_dict()),
+                "paging": {
+                    "limit": limit,
+                    "offset": offset
+                },
+                "sort": json.dumps([order_query_sort.value])
+            }
+        }
+
+        response = await self.session.request(
+            "POST", url, headers=headers, json=data
+        )
+
+        if response.status_code == 200:
+            return response.json()
+
+        raise RequestException()
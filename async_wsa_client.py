@@ -0,0 +1,50 @@
+from requests.exceptions import RequestException
+
+from app_config import AppConfig
+from app_logger import AppLogger
+from async_http_session import AsyncHttpSession
+
+
+class AsyncWsaClient:
+    app_config: AppConfig
+    app_logger: AppLogger
+    session: AsyncHttpSession
+
+    def __init__(self, app_config: AppConfig, app_logger: AppLogger):
+        self.app_config = app_config
+        self.app_logger = app_logger
+        self.session = AsyncHttpSession(app_config, "DEFAULT")
+
+    async def _post_request(self, url, headers, data):
+        try:
+            response = await self.session.request(
+                "POST", url, headers=headers, json=data, timeout=300
+            )
+
+            self.app_logger.log_request_response(
+                response
+            )
+
+            if response.status_code >= 400:
+                raise RequestException()
+
+            return response.json()
+
+        except RequestException as e:
+            print(f"Error making API request: {e!r}")
+
+            return None
+
+    async def post_correios_enderecador_encomendas(self, request_data: dict):
+        base_url = self.app_config.get("DEFAULT", "base_url")
+        url = f"{base_url}/correios/enderecador/encomendas"
+
+        headers = {
+            "Content-Type": "application/json",
+            "Accept": "application/json, text/plain, */*"
+        }
+
+        response = await self._post_request(url, headers, request_data)
+
+        if response:
+            return response
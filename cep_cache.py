@@ -0,0 +1,140 @@
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+
+from typing import Dict, Optional
+
+
+class CepCache:
+    path: str
+    ttl: int
+    negative_ttl: int
+    max_entries: int
+    hits: int
+    misses: int
+
+    def __init__(self, path: str, ttl: int = 2592000, negative_ttl: int = 86400, max_entries: int = 50000):
+        self.path = path
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+
+        self._lock = threading.Lock()
+        self._accessed_at_by_cep: Dict[str, float] = {}
+
+        directory = os.path.dirname(path)
+
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS cep ("
+            "cep TEXT PRIMARY KEY, "
+            "data TEXT, "
+            "created_at REAL NOT NULL, "
+            "accessed_at REAL NOT NULL)"
+        )
+        self._connection.execute(
+            "CREATE INDEX IF NOT EXISTS cep_accessed_at ON cep (accessed_at)"
+        )
+        self._connection.commit()
+
+    @staticmethod
+    def normalize(cep: str) -> str:
+        cep_digits_only = ''.join(re.findall(r'\d', cep or ""))
+
+        if len(cep_digits_only) != 8:
+            return ""
+
+        return cep_digits_only
+
+    def get(self, cep: str) -> Optional[dict]:
+        # Returns {} for a negatively cached CEP and None on a miss
+        key = self.normalize(cep)
+        now = time.time()
+
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT data, created_at FROM cep WHERE cep = ?", (key,)
+            ).fetchone()
+
+            if row:
+                data, created_at = row
+                ttl = self.ttl if data else self.negative_ttl
+
+                if now - created_at < ttl:
+                    # LRU touches are written in batches, see flush
+                    self._accessed_at_by_cep[key] = now
+
+                    if len(self._accessed_at_by_cep) >= 256:
+                        self._touch()
+                        self._connection.commit()
+
+                    self.hits += 1
+
+                    return json.loads(data) if data else {}
+
+            self.misses += 1
+
+            return None
+
+    def _touch(self) -> None:
+        if len(self._accessed_at_by_cep) == 0:
+            return
+
+        self._connection.executemany(
+            "UPDATE cep SET accessed_at = ? WHERE cep = ?",
+            [(accessed_at, key) for key, accessed_at in self._accessed_at_by_cep.items()]
+        )
+
+        self._accessed_at_by_cep = {}
+
+    def set(self, cep: str, endereco: Optional[dict]) -> None:
+        key = self.normalize(cep)
+        now = time.time()
+        data = json.dumps(endereco, ensure_ascii=False) if endereco else None
+
+        with self._lock:
+            self._touch()
+
+            self._connection.execute(
+                "INSERT OR REPLACE INTO cep (cep, data, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, data, now, now)
+            )
+
+            # Evict least recently used entries above the size bound
+            self._connection.execute(
+                "DELETE FROM cep WHERE cep IN ("
+                "SELECT cep FROM cep ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
+            self._connection.commit()
+
+    def flush(self) -> None:
+        with self._lock:
+            self._touch()
+            self._connection.commit()
+
+    def stats(self) -> dict:
+        with self._lock:
+            size = self._connection.execute(
+                "SELECT COUNT(*) FROM cep"
+            ).fetchone()[0]
+
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": size
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._touch()
+            self._connection.commit()
+            self._connection.close()
@@ -0,0 +1,184 @@
+import threading
+import time
+
+from collections import deque
+from enum import Enum
+from typing import Dict, Optional, Tuple
+
+from requests.exceptions import RequestException
+
+from app_config import AppConfig
+from rate_limiter import RateLimiter
+
+
+class CircuitBreakerState(Enum):
+    CLOSED = "CLOSED"
+    OPEN = "OPEN"
+    HALF_OPEN = "HALF_OPEN"
+
+
+class CircuitBreakerOpenError(RequestException):
+    pass
+
+
+class CircuitBreaker:
+    name: str
+    failure_threshold: int
+    slow_call_duration: float
+    window: float
+    open_duration: float
+    half_open_max_calls: int
+    state: CircuitBreakerState
+
+    def __init__(self, name: str, failure_threshold: int = 5, slow_call_duration: float = 30, window: float = 60, open_duration: float = 30, half_open_max_calls: int = 1):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.slow_call_duration = slow_call_duration
+        self.window = window
+        self.open_duration = open_duration
+        self.half_open_max_calls = half_open_max_calls
+        self.state = CircuitBreakerState.CLOSED
+
+        self._lock = threading.Lock()
+        self._failure_deque = deque()
+        self._opened_at = 0.0
+        self._half_open_calls = 0
+        self._half_open_at = 0.0
+
+    def _open(self, now: float) -> None:
+        self.state = CircuitBreakerState.OPEN
+        self._opened_at = now
+        self._half_open_calls = 0
+
+    def before_call(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+
+            if self.state == CircuitBreakerState.OPEN:
+                if now - self._opened_at < self.open_duration:
+                    raise CircuitBreakerOpenError(
+                        f"Circuit breaker open: {self.name}"
+                    )
+
+                self.state = CircuitBreakerState.HALF_OPEN
+                self._half_open_calls = 0
+
+            if self.state == CircuitBreakerState.HALF_OPEN:
+                # A probe that never reported back frees its slot after open_duration
+                if self._half_open_calls >= self.half_open_max_calls and now - self._half_open_at >= self.open_duration:
+                    self._half_open_calls = 0
+
+                if self._half_open_calls >= self.half_open_max_calls:
+                    raise CircuitBreakerOpenError(
+                        f"Circuit breaker half open: {self.name}"
+                    )
+
+                self._half_open_calls += 1
+                self._half_open_at = now
+
+    def after_call(self, success: bool, duration: float) -> None:
+        with self._lock:
+            now = time.monotonic()
+            failed = not success or duration >= self.slow_call_duration
+
+            if self.state == CircuitBreakerState.HALF_OPEN:
+                if failed:
+                    self._open(now)
+                else:
+                    self.state = CircuitBreakerState.CLOSED
+                    self._failure_deque.clear()
+
+                return
+
+            if not failed:
+                return
+
+            self._failure_deque.append(now)
+
+            while self._failure_deque and now - self._failure_deque[0] > self.window:
+                self._failure_deque.popleft()
+
+            if len(self._failure_deque) >= self.failure_threshold:
+                self._failure_deque.clear()
+                self._open(now)
+
+    def is_open(self) -> bool:
+        with self._lock:
+            return self.state == CircuitBreakerState.OPEN and time.monotonic() - self._opened_at < self.open_duration
+
+
+class CircuitBreakerRegistry:
+    circuit_breakers: Dict[Tuple[str, str], CircuitBreaker]
+
+    def __init__(self):
+        self.circuit_breakers = {}
+
+        self._lock = threading.Lock()
+
+    def circuit_breaker(self, url: str, app_config: AppConfig, section: str) -> Optional[CircuitBreaker]:
+        host, family = RateLimiter.endpoint_family(url)
+
+        with self._lock:
+            if (host, family) in self.circuit_breakers:
+                return self.circuit_breakers[(host, family)]
+
+            failure_threshold = app_config.get(
+                section, "circuit_breaker_failure_threshold"
+            )
+
+            circuit_breaker = None
+
+            if failure_threshold:
+                circuit_breaker = CircuitBreaker(
+                    f"{host}/{family}",
+                    failure_threshold=int(failure_threshold),
+                    slow_call_duration=float(
+                        app_config.get(
+                            section, "circuit_breaker_slow_call_duration", 30
+                        )
+                    ),
+                    window=float(
+                        app_config.get(section, "circuit_breaker_window", 60)
+                    ),
+                    open_duration=float(
+                        app_config.get(
+                            section, "circuit_breaker_open_duration", 30
+                        )
+                    ),
+                    half_open_max_calls=int(
+                        app_config.get(
+                            section, "circuit_breaker_half_open_max_calls", 1
+                        )
+                    )
+                )
+
+            self.circuit_breakers[(host, family)] = circuit_breaker
+
+            return circuit_breaker
+
+    def state_list(self) -> list:
+        with self._lock:
+            circuit_breaker_list = [
+                circuit_breaker for circuit_breaker in self.circuit_breakers.values() if circuit_breaker
+            ]
+
+        return [
+            {
+                "name": circuit_breaker.name,
+                "state": circuit_breaker.state.value,
+                "open": circuit_breaker.is_open()
+            }
+            for circuit_breaker in circuit_breaker_list
+        ]
+
+    def is_open(self, url: str) -> bool:
+        with self._lock:
+            circuit_breaker = self.circuit_breakers.get(
+                RateLimiter.endpoint_family(url)
+            )
+
+        return bool(circuit_breaker) and circuit_breaker.is_open()
+
+
+# Shared by every client, so clients calling the same host share its breakers
+circuit_breaker_registry = CircuitBreakerRegistry()
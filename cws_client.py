@@ -1,5 +1,6 @@
 import base64
 import json
+import os
 import re
 
 import requests
@@ -9,6 +10,8 @@ from retrying import retry
 
 from app_config import AppConfig
 from app_logger import AppLogger
+from cws_token_manager import CwsTokenManager
+from http_session import HttpSession
 from cws_data import PrePostagemModalidadePagamento, PrePostagemQueryFilter, PrePostagemStatus, PrePostagemTipoObjeto
 
 
@@ -17,11 +20,50 @@ class CwsClient:
     ambiente: str
     app_logger: AppLogger
     response_data_autentica: dict
+    session: HttpSession
+    token_manager: CwsTokenManager
 
     def __init__(self, app_config: AppConfig, ambiente: str, app_logger: AppLogger):
         self.app_config = app_config
         self.ambiente = ambiente
         self.app_logger = app_logger
+        self.session = HttpSession(app_config, ambiente)
+
+        if self.app_config.has_option(ambiente, "numero_cartao_postagem"):
+            authenticate = self.post_token_v1_autentica_cartaopostagem
+        else:
+            authenticate = self.post_token_v1_autentica
+
+        self.token_manager = CwsTokenManager(
+            self.app_config.get(
+                ambiente,
+                "token_cache_path",
+                os.path.join("cache", f"cws_token_{ambiente.lower()}.json")
+            ),
+            authenticate,
+            refresh_margin=int(
+                self.app_config.get(ambiente, "token_refresh_margin", 300)
+            )
+        )
+
+    def _request(self, method: str, url: str, **kwargs) -> requests.Response:
+        # The session is shared by worker threads, so the token stays per request
+        headers = kwargs.pop("headers", None) or {}
+
+        token = self.token_manager.token()
+
+        response = self.session.request(
+            method, url, headers={**headers, "Authorization": f"Bearer {token}"}, **kwargs
+        )
+
+        if response.status_code == 401:
+            token = self.token_manager.refresh(token)
+
+            response = self.session.request(
+                method, url, headers={**headers, "Authorization": f"Bearer {token}"}, **kwargs
+            )
+
+        return response
 
     def delete_prepostagem_v1_prepostagens_objeto(self, codigo_objeto: str) -> dict:
         base_url = self.app_config.get(self.ambiente, "base_url")
@@ -32,12 +74,11 @@ class CwsClient:
 
         headers = {
             "accept": "application/json",
-            "Content-Type": "application/json",
-            "Authorization": f"Bearer {self.response_data_autentica.get('token')}"
+            "Content-Type": "application/json"
         }
 
         try:
-            response = requests.delete(url, headers=headers, timeout=10)
+            response = self._request("DELETE", url, headers=headers, timeout=10)
 
             self.app_logger.log_request_response(
                 response
@@ -57,49 +98,53 @@ class CwsClient:
         url = f"{base_url}/cep/v2/enderecos/{cep_digits_only}"
 
         headers = {
-            "Accept": "application/json",
-            "Authorization": f"Bearer {self.response_data_autentica.get('token')}"
+            "Accept": "application/json"
         }
 
-        response = requests.get(url, headers=headers, timeout=10)
+        response = self._request("GET", url, headers=headers, timeout=10)
 
         if response.status_code == 200:
             return response.json()
 
-    def get_meucontrato_v1_empresas_contratos_cartoes_servicos(self, descricao: str) -> dict:
+        if response.status_code in (400, 404):
+            return None
+
+        raise RequestException(response=response)
+
+    def get_meucontrato_v1_empresas_contratos_cartoes_servicos(self, page: int = 0, size: int = 200) -> dict:
         base_url = self.app_config.get(self.ambiente, "base_url")
         cnpj = self.app_config.get(self.ambiente, "cnpj")
         numero_contrato = self.app_config.get(self.ambiente, "numero_contrato")
         numero_cartao_postagem = self.app_config.get(
             self.ambiente, "numero_cartao_postagem"
         )
-        url = f"{base_url}/meucontrato/v1/empresas/{cnpj}/contratos/{numero_contrato}/cartoes/{numero_cartao_postagem}/servicos?page=0&size=200"
+        url = f"{base_url}/meucontrato/v1/empresas/{cnpj}/contratos/{numero_contrato}/cartoes/{numero_cartao_postagem}/servicos?page={page}&size={size}"
 
         headers = {
-            "Accept": "application/json",
-            "Authorization": f"Bearer {self.response_data_autentica.get('token')}"
+            "Accept": "application/json"
         }
 
-        response = requests.get(url, headers=headers, timeout=10)
+        try:
+            response = self._request("GET", url, headers=headers, timeout=10)
 
-        if response.status_code == 200:
-            response_data = response.json()
+            if response.status_code == 200:
+                return response.json()
+
+            raise RequestException()
 
-            for item in response_data["itens"]:
-                if item.get("descricao", "").lower() == descricao.lower():
-                    return item
+        except RequestException as error:
+            raise RequestException() from error
 
     def get_prepostagem_v1_prepostagens_declaracaoconteudo(self, id_pre_postagem: str) -> str:
         base_url = self.app_config.get(self.ambiente, "base_url")
         url = f"{base_url}/prepostagem/v1/prepostagens/declaracaoconteudo/{id_pre_postagem}"
 
         headers = {
-            "Accept": "application/json, text/html, text/plain",
-            "Authorization": f"Bearer {self.response_data_autentica.get('token')}"
+            "Accept": "application/json, text/html, text/plain"
         }
 
         try:
-            response = requests.get(url, headers=headers, timeout=10)
+            response = self._request("GET", url, headers=headers, timeout=10)
 
             if response.status_code == 200:
                 return response.text
@@ -116,41 +161,25 @@ class CwsClient:
         except requests.exceptions.RequestException:
             return ""
 
-    def get_prepostagem_v2_prepostagens(self, pre_postagem_query_filter: PrePostagemQueryFilter) -> dict:
+    def get_prepostagem_v2_prepostagens(self, pre_postagem_query_filter: PrePostagemQueryFilter, page: int = 0, size: int = 100) -> dict:
         base_url = self.app_config.get(self.ambiente, "base_url")
         endpoint_url = f"{base_url}/prepostagem/v2/prepostagens?"
 
-        params = []
-
-        if pre_postagem_query_filter.codigo_objeto:
-            params.append(
-                f"codigoObjeto={pre_postagem_query_filter.codigo_objeto}"
-            )
-
-        if pre_postagem_query_filter.modalidade_pagamento:
-            params.append(
-                f"modalidadePagamento={pre_postagem_query_filter.modalidade_pagamento.value}"
-            )
-
-        if pre_postagem_query_filter.tipo_objeto:
-            params.append(
-                f"tipoObjeto={pre_postagem_query_filter.tipo_objeto.value}"
-            )
+        params = [
+            f"{key}={value}" for key, value in pre_postagem_query_filter.to_dict().items()
+        ]
 
-        if pre_postagem_query_filter.status:
-            params.append(
-                f"status={pre_postagem_query_filter.status.value}"
-            )
+        params.append(f"page={page}")
+        params.append(f"size={size}")
 
-        url = endpoint_url + '&'.join(params) + "&page=0&size=100"
+        url = endpoint_url + '&'.join(params)
 
         headers = {
-            "Accept": "application/json",
-            "Authorization": f"Bearer {self.response_data_autentica.get('token')}"
+            "Accept": "application/json"
         }
 
         try:
-            response = requests.get(url, headers=headers, timeout=10)
+            response = self._request("GET", url, headers=headers, timeout=10)
 
             if response.status_code == 200:
                 return response.json()
@@ -166,13 +195,12 @@ class CwsClient:
 
         headers = {
             "Accept": "application/json",
-            "Content-Type": "application/json",
-            "Authorization": f"Bearer {self.response_data_autentica.get('token')}"
+            "Content-Type": "application/json"
         }
 
         try:
-            response = requests.post(
-                url, headers=headers, json=request_data, timeout=10
+            response = self._request(
+                "POST", url, headers=headers, json=request_data, timeout=10
             )
 
             self.app_logger.log_request_response(
@@ -193,8 +221,7 @@ class CwsClient:
 
         headers = {
             "Accept": "*/*",
-            "Content-Type": "application/json",
-            "Authorization": f"Bearer {self.response_data_autentica.get('token')}"
+            "Content-Type": "application/json"
         }
 
         numero_cartao_postagem = self.app_config.get(
@@ -209,8 +236,8 @@ class CwsClient:
             "imprimeRemetente": "S"
         }
 
-        response = requests.post(
-            url, headers=headers, json=request_data, timeout=10
+        response = self._request(
+            "POST", url, headers=headers, json=request_data, timeout=10
         )
 
         if response.status_code == 200:
@@ -222,12 +249,11 @@ class CwsClient:
 
         headers = {
             "Accept": "*/*",
-            "Content-Type": "application/json",
-            "Authorization": f"Bearer {self.response_data_autentica.get('token')}"
+            "Content-Type": "application/json"
         }
 
         try:
-            response = requests.get(url, headers=headers, timeout=10)
+            response = self._request("GET", url, headers=headers, timeout=10)
 
             if response.status_code == 200:
                 return response.json()
@@ -241,7 +267,7 @@ class CwsClient:
             return ""
 
     @retry(wait_fixed=5, stop_max_attempt_number=3)
-    def post_token_v1_autentica(self) -> None:
+    def post_token_v1_autentica(self) -> dict:
         base_url = self.app_config.get(self.ambiente, "base_url")
         url = f"{base_url}/token/v1/autentica"
 
@@ -262,7 +288,7 @@ class CwsClient:
         }
 
         try:
-            response = requests.post(
+            response = self.session.post(
                 url, headers=headers, timeout=10
             )
 
@@ -275,6 +301,8 @@ class CwsClient:
 
                 self.response_data_autentica = response_data
 
+                return response_data
+
         except requests.exceptions.HTTPError as e:
             print(f"HTTP Error: {e}")
 
@@ -285,7 +313,7 @@ class CwsClient:
             print(f"Unexpected Error: {e}")
 
     @retry(wait_fixed=5, stop_max_attempt_number=3)
-    def post_token_v1_autentica_cartaopostagem(self) -> None:
+    def post_token_v1_autentica_cartaopostagem(self) -> dict:
         base_url = self.app_config.get(self.ambiente, "base_url")
         url = f"{base_url}/token/v1/autentica/cartaopostagem"
 
@@ -313,7 +341,7 @@ class CwsClient:
         }
 
         try:
-            response = requests.post(
+            response = self.session.post(
                 url, headers=headers, json=data, timeout=10
             )
 
@@ -326,6 +354,8 @@ class CwsClient:
 
                 self.response_data_autentica = response_data
 
+                return response_data
+
         except requests.exceptions.HTTPError as e:
             print(f"HTTP Error: {e}")
 
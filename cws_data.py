@@ -25,6 +25,19 @@ class PrePostagemTipoObjeto(Enum):
     REGISTRADO = "REGISTRADO"
 
 
+class ServicoDescricao(Enum):
+    PAC = "PAC CONTRATO AG"
+    SEDEX = "SEDEX CONTRATO AG"
+
+
+# Valor declarado additional service of each contract service, used when the
+# contract catalog does not list the additional services itself
+SERVICO_ADICIONAL_VALOR_DECLARADO = {
+    "03298": "064",
+    "03220": "019"
+}
+
+
 @dataclass
 class PrePostagemQueryFilter:
     codigo_objeto: Optional[str] = None
@@ -33,4 +46,18 @@ class PrePostagemQueryFilter:
     status: Optional[PrePostagemStatus] = None
 
     def to_dict(self):
-        pass
+        query_params = {}
+
+        if self.codigo_objeto:
+            query_params["codigoObjeto"] = self.codigo_objeto
+
+        if self.modalidade_pagamento:
+            query_params["modalidadePagamento"] = self.modalidade_pagamento.value
+
+        if self.tipo_objeto:
+            query_params["tipoObjeto"] = self.tipo_objeto.value
+
+        if self.status:
+            query_params["status"] = self.status.value
+
+        return query_params
@@ -1,55 +1,251 @@
+import asyncio
+import base64
+import io
 import json
+import os
 import time
 
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterator, List
+
+from pypdf import PdfWriter
+
 from app_config import AppConfig
 from app_logger import AppLogger
+from async_cws_client import AsyncCwsClient
+from cep_cache import CepCache
 from cws_client import CwsClient
 from cws_data import PrePostagemModalidadePagamento, PrePostagemQueryFilter, PrePostagemStatus, PrePostagemTipoObjeto
+from cws_servico_catalog import CwsServicoCatalog
 
 
 class CwsHandler:
     app_config: AppConfig
     app_logger: AppLogger
+    async_cws_client: AsyncCwsClient
+    cep_cache: CepCache
+    cep_max_workers: int
     cws_client: CwsClient
+    pre_postagem_max_workers: int
+    pre_postagem_page_size: int
+    rotulo_chunk_size: int
+    rotulo_max_workers: int
+    rotulo_poll_initial_delay: float
+    rotulo_poll_max_delay: float
+    rotulo_poll_deadline: float
+    servico_catalog: CwsServicoCatalog
 
     def __init__(self, app_config: AppConfig, ambiente: str, app_logger: AppLogger):
         self.app_config = app_config
         self.cws_client = CwsClient(
             app_config, ambiente, app_logger
         )
+        self.async_cws_client = AsyncCwsClient(
+            app_config, ambiente, app_logger, self.cws_client.token_manager
+        )
+
+        self.cep_cache = CepCache(
+            app_config.get(
+                ambiente, "cep_cache_path", os.path.join("cache", "cep.sqlite3")
+            ),
+            ttl=int(app_config.get(ambiente, "cep_cache_ttl", 2592000)),
+            negative_ttl=int(
+                app_config.get(ambiente, "cep_cache_negative_ttl", 86400)
+            ),
+            max_entries=int(
+                app_config.get(ambiente, "cep_cache_max_entries", 50000)
+            )
+        )
+
+        self.cep_max_workers = int(
+            app_config.get(ambiente, "cep_max_workers", 8)
+        )
+
+        self.pre_postagem_max_workers = int(
+            app_config.get(ambiente, "pre_postagem_max_workers", 4)
+        )
+        self.pre_postagem_page_size = int(
+            app_config.get(ambiente, "pre_postagem_page_size", 100)
+        )
+
+        self.servico_catalog = CwsServicoCatalog(
+            app_config.get(
+                ambiente,
+                "servico_catalog_path",
+                os.path.join("cache", f"cws_servicos_{ambiente.lower()}.json")
+            ),
+            self.cws_client.get_meucontrato_v1_empresas_contratos_cartoes_servicos,
+            ttl=int(app_config.get(ambiente, "servico_catalog_ttl", 86400))
+        )
 
-        if self.app_config.has_option(ambiente, "numero_cartao_postagem"):
-            self.cws_client.post_token_v1_autentica_cartaopostagem()
-        else:
-            self.cws_client.post_token_v1_autentica()
+        self.rotulo_chunk_size = int(
+            app_config.get(ambiente, "rotulo_chunk_size", 50)
+        )
+        self.rotulo_max_workers = int(
+            app_config.get(ambiente, "rotulo_max_workers", 4)
+        )
+        self.rotulo_poll_initial_delay = float(
+            app_config.get(ambiente, "rotulo_poll_initial_delay", 1)
+        )
+        self.rotulo_poll_max_delay = float(
+            app_config.get(ambiente, "rotulo_poll_max_delay", 16)
+        )
+        self.rotulo_poll_deadline = float(
+            app_config.get(ambiente, "rotulo_poll_deadline", 180)
+        )
 
     def cep_endereco(self, cep: str) -> dict:
+        if not CepCache.normalize(cep):
+            return {}
+
+        endereco = self.cep_cache.get(cep)
+
+        if endereco is not None:
+            return endereco
+
         try:
             response = self.cws_client.get_cep_v2_enderecos(cep)
 
-            return response
+        except Exception:
+            return {}
+
+        # Unknown CEPs (None) are cached too, so they are not retried every run
+        self.cep_cache.set(cep, response)
+
+        return response or {}
+
+    async def cep_endereco_async(self, cep: str) -> dict:
+        if not CepCache.normalize(cep):
+            return {}
+
+        endereco = self.cep_cache.get(cep)
+
+        if endereco is not None:
+            return endereco
+
+        try:
+            response = await self.async_cws_client.get_cep_v2_enderecos(cep)
 
         except Exception:
             return {}
 
+        self.cep_cache.set(cep, response)
+
+        return response or {}
+
+    async def cep_endereco_many_async(self, ceps: List[str]) -> Dict[str, dict]:
+        cep_list_dict = {}
+
+        for cep in ceps:
+            cep_list_dict.setdefault(CepCache.normalize(cep), []).append(cep)
+
+        cep_list_dict.pop("", None)
+
+        cep_endereco_dict = {cep: {} for cep in ceps}
+
+        # Same bound as the thread pool in cep_endereco_many
+        semaphore = asyncio.Semaphore(self.cep_max_workers)
+
+        async def cep_endereco(cep: str) -> dict:
+            async with semaphore:
+                return await self.cep_endereco_async(cep)
+
+        endereco_list = await asyncio.gather(*[
+            cep_endereco(cep) for cep in cep_list_dict
+        ])
+
+        for cep_list, endereco in zip(cep_list_dict.values(), endereco_list):
+            for cep in cep_list:
+                cep_endereco_dict[cep] = endereco
+
+        self.cep_cache.flush()
+
+        return cep_endereco_dict
+
+    def cep_endereco_many(self, ceps: List[str]) -> Dict[str, dict]:
+        cep_list_dict = {}
+
+        for cep in ceps:
+            cep_list_dict.setdefault(CepCache.normalize(cep), []).append(cep)
+
+        cep_list_dict.pop("", None)
+
+        cep_endereco_dict = {cep: {} for cep in ceps}
+
+        if len(cep_list_dict) == 0:
+            return cep_endereco_dict
+
+        with ThreadPoolExecutor(max_workers=self.cep_max_workers) as executor:
+            endereco_list = executor.map(self.cep_endereco, cep_list_dict)
+
+            for cep_list, endereco in zip(cep_list_dict.values(), endereco_list):
+                for cep in cep_list:
+                    cep_endereco_dict[cep] = endereco
+
+        # LRU touches of this batch reach disk even if the process is killed later
+        self.cep_cache.flush()
+
+        return cep_endereco_dict
+
+    def cep_cache_flush(self) -> None:
+        self.cep_cache.flush()
+
+    def cep_cache_stats(self) -> dict:
+        return self.cep_cache.stats()
+
+    def close(self) -> None:
+        self.cep_cache.close()
+
     def codigo_servico(self, descricao: str) -> str:
         try:
-            response = self.cws_client.get_meucontrato_v1_empresas_contratos_cartoes_servicos(
-                descricao
-            )
-
-            return response.get("codigo")
+            return self.servico_catalog.codigo_servico(descricao)
 
         except Exception:
             return ""
 
-    def pre_postagem_query(self, pre_postagem_query_filter: PrePostagemQueryFilter) -> list:
+    def codigo_servico_adicional_valor_declarado(self, codigo_servico: str) -> str:
         try:
-            response = self.cws_client.get_prepostagem_v2_prepostagens(
-                pre_postagem_query_filter
+            return self.servico_catalog.codigo_servico_adicional_valor_declarado(
+                codigo_servico
             )
 
-            return response.get("itens", [])
+        except Exception:
+            return ""
+
+    def pre_postagem_iter(self, pre_postagem_query_filter: PrePostagemQueryFilter) -> Iterator[dict]:
+        response = self.cws_client.get_prepostagem_v2_prepostagens(
+            pre_postagem_query_filter, page=0, size=self.pre_postagem_page_size
+        )
+
+        yield from response.get("itens", [])
+
+        total_pages = response.get("page", {}).get("totalPages", 1)
+
+        if total_pages <= 1:
+            return
+
+        with ThreadPoolExecutor(max_workers=self.pre_postagem_max_workers) as executor:
+            future_deque = deque()
+            page = 1
+
+            # At most pre_postagem_max_workers pages are held at any time
+            while page < total_pages or future_deque:
+                while page < total_pages and len(future_deque) < self.pre_postagem_max_workers:
+                    future_deque.append(executor.submit(
+                        self.cws_client.get_prepostagem_v2_prepostagens,
+                        pre_postagem_query_filter,
+                        page,
+                        self.pre_postagem_page_size
+                    ))
+
+                    page += 1
+
+                yield from future_deque.popleft().result().get("itens", [])
+
+    def pre_postagem_query(self, pre_postagem_query_filter: PrePostagemQueryFilter) -> list:
+        try:
+            return list(self.pre_postagem_iter(pre_postagem_query_filter))
 
         except Exception:
             return []
@@ -59,6 +255,11 @@ class CwsHandler:
             json_data
         )
 
+    async def pre_postagem_nova_async(self, json_data: dict) -> dict:
+        return await self.async_cws_client.post_prepostagem_v1_prepostagens(
+            json_data
+        )
+
     def pre_postagem_cancela(self, codigo_objeto: str) -> None:
         self.cws_client.delete_prepostagem_v1_prepostagens_objeto(
             codigo_objeto
@@ -68,17 +269,66 @@ class CwsHandler:
         return self.cws_client.get_prepostagem_v1_prepostagens_declaracaoconteudo(id_pre_postagem)
 
     def pre_postagem_rotulo(self, codigo_objeto: list) -> dict:
-        if len(codigo_objeto) > 0:
-            recibo_response = self.cws_client.post_prepostagem_v1_prepostagens_rotulo_assincrono_pdf(
-                codigo_objeto
+        if len(codigo_objeto) == 0:
+            return {}
+
+        chunk_list = [
+            codigo_objeto[index:index + self.rotulo_chunk_size]
+            for index in range(0, len(codigo_objeto), self.rotulo_chunk_size)
+        ]
+
+        with ThreadPoolExecutor(max_workers=self.rotulo_max_workers) as executor:
+            pdf_response_list = list(
+                executor.map(self._pre_postagem_rotulo_chunk, chunk_list)
             )
 
-            id_recibo = recibo_response.get("idRecibo")
+        if len(pdf_response_list) == 1:
+            return pdf_response_list[0]
 
-            time.sleep(1)
+        pdf_content = self._pdf_merge([
+            base64.b64decode(pdf_response.get("dados"))
+            for pdf_response in pdf_response_list
+        ])
+
+        return {
+            "nome": pdf_response_list[0].get("nome"),
+            "dados": base64.b64encode(pdf_content).decode("utf-8")
+        }
+
+    def _pre_postagem_rotulo_chunk(self, codigo_objeto: list) -> dict:
+        recibo_response = self.cws_client.post_prepostagem_v1_prepostagens_rotulo_assincrono_pdf(
+            codigo_objeto
+        )
+
+        if not recibo_response or not recibo_response.get("idRecibo"):
+            raise ValueError(f"Rotulo request failed: {codigo_objeto}")
+
+        id_recibo = recibo_response.get("idRecibo")
+
+        deadline = time.monotonic() + self.rotulo_poll_deadline
+        delay = self.rotulo_poll_initial_delay
+
+        while time.monotonic() + delay <= deadline:
+            time.sleep(delay)
 
             pdf_response = self.cws_client.get_prepostagem_v1_prepostagens_rotulo_download_assincrono(
                 id_recibo
             )
 
-            return pdf_response
+            if pdf_response and pdf_response.get("dados"):
+                return pdf_response
+
+            delay = min(delay * 2, self.rotulo_poll_max_delay)
+
+        raise TimeoutError(f"Rotulo not ready: idRecibo {id_recibo}")
+
+    def _pdf_merge(self, pdf_content_list: List[bytes]) -> bytes:
+        pdf_writer = PdfWriter()
+
+        for pdf_content in pdf_content_list:
+            pdf_writer.append(io.BytesIO(pdf_content))
+
+        output = io.BytesIO()
+        pdf_writer.write(output)
+
+        return output.getvalue()
@@ -0,0 +1,126 @@
+import json
+import os
+import threading
+
+from typing import Any, Callable, Dict, Optional, Tuple
+
+
+# Variable fields of a pre-postagem payload and where each one sits
+CWS_PRE_POSTAGEM_TEMPLATE_FIELD_PATH = {
+    "destinatario": ("destinatario",),
+    "codigoServico": ("codigoServico",),
+    "codigoServicoAdicional": ("listaServicoAdicional", 0, "codigoServicoAdicional"),
+    "valorDeclarado": ("listaServicoAdicional", 0, "valorDeclarado"),
+    "itensDeclaracaoConteudo": ("itensDeclaracaoConteudo",),
+    "pesoInformado": ("pesoInformado",),
+    "observacao": ("observacao",)
+}
+
+
+def _copy(value: Any) -> Any:
+    # The template only holds JSON types, so this beats copy.deepcopy
+    if isinstance(value, dict):
+        return {key: _copy(item) for key, item in value.items()}
+
+    if isinstance(value, list):
+        return [_copy(item) for item in value]
+
+    return value
+
+
+def _setter(path: Tuple) -> Callable[[dict, Any], None]:
+    parent_path, key = path[:-1], path[-1]
+
+    def setter(payload: dict, value: Any) -> None:
+        parent = payload
+
+        for step in parent_path:
+            parent = parent[step]
+
+        parent[key] = value
+
+    return setter
+
+
+class CwsPrePostagemTemplate:
+    path: str
+    _payload: Optional[dict]
+    _setter_by_field: Dict[str, Callable[[dict, Any], None]]
+    _remetente_enderecador: Optional[dict]
+
+    def __init__(self, path: str):
+        self.path = path
+        self._payload = None
+        self._setter_by_field = {}
+        self._remetente_enderecador = None
+
+        self._lock = threading.Lock()
+
+    def _validate(self, payload: dict) -> None:
+        remetente = payload.get("remetente")
+
+        if not isinstance(remetente, dict) or not isinstance(remetente.get("endereco"), dict):
+            raise ValueError(f"{self.path}: remetente.endereco is missing")
+
+        for field, path in CWS_PRE_POSTAGEM_TEMPLATE_FIELD_PATH.items():
+            parent = payload
+
+            try:
+                for step in path[:-1]:
+                    parent = parent[step]
+
+                if path[-1] not in parent:
+                    raise KeyError(path[-1])
+
+            except (IndexError, KeyError, TypeError) as error:
+                raise ValueError(f"{self.path}: {field} has no slot") from error
+
+    def _load(self) -> dict:
+        if self._payload is not None:
+            return self._payload
+
+        with self._lock:
+            if self._payload is None:
+                with open(self.path, "r", encoding="utf-8") as file:
+                    payload = json.load(file)
+
+                self._validate(payload)
+
+                self._setter_by_field = {
+                    field: _setter(path) for field, path in CWS_PRE_POSTAGEM_TEMPLATE_FIELD_PATH.items()
+                }
+                self._payload = payload
+
+        return self._payload
+
+    def payload(self, field_dict: Dict[str, Any]) -> dict:
+        payload = _copy(self._load())
+
+        for field, value in field_dict.items():
+            self._setter_by_field[field](payload, value)
+
+        return payload
+
+    def remetente_enderecador(self) -> dict:
+        if self._remetente_enderecador is None:
+            remetente = self._load()["remetente"]
+            remetente_endereco = remetente["endereco"]
+
+            self._remetente_enderecador = {
+                "nome": remetente.get("nome"),
+                "cpf_cnpj": remetente.get("cpfCnpj"),
+                "logradouro": remetente_endereco.get("logradouro"),
+                "numero": remetente_endereco.get("numero"),
+                "complemento": remetente_endereco.get("complemento"),
+                "bairro": remetente_endereco.get("bairro"),
+                "cidade": remetente_endereco.get("cidade"),
+                "estado": remetente_endereco.get("uf"),
+                "cep": remetente_endereco.get("cep")
+            }
+
+        return dict(self._remetente_enderecador)
+
+
+cws_pre_postagem_template = CwsPrePostagemTemplate(
+    os.path.join("openapi_example_value", "cws_pre_postagem.json")
+)
@@ -0,0 +1,120 @@
+import json
+import os
+import threading
+import time
+
+from typing import Callable, Dict, List, Optional
+
+from cws_data import SERVICO_ADICIONAL_VALOR_DECLARADO
+
+
+class CwsServicoCatalog:
+    path: str
+    load_page: Callable[[int, int], dict]
+    ttl: int
+    page_size: int
+    loaded_at: float
+    servico_by_codigo: Dict[str, dict]
+    servico_by_descricao: Dict[str, dict]
+
+    def __init__(self, path: str, load_page: Callable[[int, int], dict], ttl: int = 86400, page_size: int = 200):
+        self.path = path
+        self.load_page = load_page
+        self.ttl = ttl
+        self.page_size = page_size
+        self.loaded_at = 0.0
+        self.servico_by_codigo = {}
+        self.servico_by_descricao = {}
+
+        self._lock = threading.Lock()
+
+    def _index(self, servico_list: List[dict], loaded_at: float) -> None:
+        self.servico_by_codigo = {
+            str(servico.get("codigo")): servico for servico in servico_list
+        }
+        self.servico_by_descricao = {
+            servico.get("descricao", "").strip().lower(): servico for servico in servico_list
+        }
+        self.loaded_at = loaded_at
+
+    def _load_file(self) -> Optional[dict]:
+        try:
+            with open(self.path, "r", encoding="utf-8") as file:
+                return json.load(file)
+
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def _save_file(self, servico_list: List[dict], loaded_at: float) -> None:
+        directory = os.path.dirname(self.path)
+
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+
+        temp_path = f"{self.path}.tmp"
+
+        with open(temp_path, "w", encoding="utf-8") as file:
+            json.dump(
+                {"timestamp": loaded_at, "itens": servico_list},
+                file,
+                ensure_ascii=False
+            )
+
+        os.replace(temp_path, self.path)
+
+    def _load_api(self) -> List[dict]:
+        servico_list = []
+        page = 0
+
+        while True:
+            response = self.load_page(page, self.page_size)
+
+            servico_list.extend(response.get("itens", []))
+
+            page += 1
+
+            if page >= response.get("page", {}).get("totalPages", 1):
+                return servico_list
+
+    def _ensure_loaded(self) -> None:
+        with self._lock:
+            now = time.time()
+
+            if now - self.loaded_at < self.ttl:
+                return
+
+            data = self._load_file()
+
+            if data and now - data.get("timestamp", 0.0) < self.ttl:
+                self._index(data.get("itens", []), data.get("timestamp"))
+
+                return
+
+            servico_list = self._load_api()
+
+            self._index(servico_list, now)
+            self._save_file(servico_list, now)
+
+    def get_by_codigo(self, codigo: str) -> Optional[dict]:
+        self._ensure_loaded()
+
+        return self.servico_by_codigo.get(str(codigo))
+
+    def get_by_descricao(self, descricao: str) -> Optional[dict]:
+        self._ensure_loaded()
+
+        return self.servico_by_descricao.get(descricao.strip().lower())
+
+    def codigo_servico(self, descricao: str) -> str:
+        servico = self.get_by_descricao(descricao) or {}
+
+        return servico.get("codigo", "")
+
+    def codigo_servico_adicional_valor_declarado(self, codigo_servico: str) -> str:
+        servico = self.get_by_codigo(codigo_servico) or {}
+
+        for servico_adicional in servico.get("servicosAdicionais", []):
+            if "valor declarado" in servico_adicional.get("descricao", "").lower():
+                return servico_adicional.get("codigo", "")
+
+        return SERVICO_ADICIONAL_VALOR_DECLARADO.get(codigo_servico, "")
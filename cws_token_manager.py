@@ -0,0 +1,121 @@
+import json
+import os
+import threading
+import time
+
+from datetime import datetime
+from typing import Callable, Optional
+
+from requests.exceptions import RequestException
+
+
+class CwsTokenManager:
+    path: str
+    authenticate: Callable[[], Optional[dict]]
+    refresh_margin: int
+    token_data: dict
+
+    def __init__(self, path: str, authenticate: Callable[[], Optional[dict]], refresh_margin: int = 300):
+        self.path = path
+        self.authenticate = authenticate
+        self.refresh_margin = refresh_margin
+        self.token_data = {}
+
+        self._lock = threading.Lock()
+        self._timer: Optional[threading.Timer] = None
+
+        self._load()
+
+    def _load(self) -> None:
+        try:
+            with open(self.path, "r", encoding="utf-8") as file:
+                self.token_data = json.load(file)
+
+        except (FileNotFoundError, json.JSONDecodeError):
+            self.token_data = {}
+
+            return
+
+        if self._is_valid():
+            self._schedule_refresh()
+
+    def _save(self) -> None:
+        directory = os.path.dirname(self.path)
+
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+
+        temp_path = f"{self.path}.tmp"
+
+        # The token is a credential, keep it readable by the owner only
+        file_descriptor = os.open(
+            temp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600
+        )
+
+        with os.fdopen(file_descriptor, "w", encoding="utf-8") as file:
+            json.dump(self.token_data, file)
+
+        os.replace(temp_path, self.path)
+
+    @staticmethod
+    def _expires_at(response_data: dict) -> float:
+        expira_em = response_data.get("expiraEm")
+
+        if not expira_em:
+            return time.time() + 3600
+
+        return datetime.fromisoformat(expira_em).timestamp()
+
+    def _is_valid(self) -> bool:
+        if not self.token_data.get("token"):
+            return False
+
+        return time.time() < self.token_data.get("expires_at", 0.0) - self.refresh_margin
+
+    def _refresh(self) -> None:
+        response_data = self.authenticate()
+
+        if not response_data or not response_data.get("token"):
+            raise RequestException("Correios authentication failed")
+
+        self.token_data = dict(response_data)
+        self.token_data["expires_at"] = self._expires_at(response_data)
+
+        self._save()
+        self._schedule_refresh()
+
+    def _refresh_background(self) -> None:
+        try:
+            with self._lock:
+                self._refresh()
+
+        except Exception as e:
+            print(f"Token refresh error: {e}")
+
+    def _schedule_refresh(self) -> None:
+        if self._timer:
+            self._timer.cancel()
+
+        delay = self.token_data.get("expires_at", 0.0) - self.refresh_margin - time.time()
+
+        if delay <= 0:
+            return
+
+        self._timer = threading.Timer(delay, self._refresh_background)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def token(self) -> str:
+        with self._lock:
+            if not self._is_valid():
+                self._refresh()
+
+            return self.token_data.get("token")
+
+    def refresh(self, rejected_token: str) -> str:
+        with self._lock:
+            # Another thread may have replaced the rejected token already
+            if self.token_data.get("token") == rejected_token:
+                self._refresh()
+
+            return self.token_data.get("token")
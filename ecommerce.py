@@ -1,59 +1,435 @@
-from typing import Any, Dict
+from typing import Any, Dict, Iterable, List
 
+import asyncio
 import base64
-import json
 import os
 import re
 import time
 
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 
 from prettytable import PrettyTable, FRAME, HEADER, NONE
 from thefuzz import fuzz
 
-from cws_data import PrePostagemModalidadePagamento, PrePostagemQueryFilter, PrePostagemStatus, PrePostagemTipoObjeto
+from circuit_breaker import CircuitBreakerOpenError, circuit_breaker_registry
+from cws_data import PrePostagemModalidadePagamento, PrePostagemQueryFilter, PrePostagemStatus, PrePostagemTipoObjeto, ServicoDescricao
 from cws_handler import CwsHandler
+from cws_pre_postagem_template import cws_pre_postagem_template
+from job_journal import JobJournal
+from mongodb_data import PRE_POSTAGEM_INDEX_LIST, WIX_ORDER_INDEX_LIST
 from mongodb_handler import MongoDBHandler
+from pipeline import Pipeline, PipelineStage
 from wsa_handler import WsaHandler
 from wix_data import FilterOperator, FulfillmentStatus, PaymentStatus, OrderFulfillment, OrderQueryFilter, OrderQuerySort
+from wix_order import WixOrder
 from wix_order_handler import WixOrderHandler
 
 
 class Ecommerce:
     cws_handler: CwsHandler
+    job_journal: JobJournal
     mongodb_handler: MongoDBHandler
     wsa_handler: WsaHandler
     wix_order_handler: WixOrderHandler
 
-    def __init__(self, cws_handler: CwsHandler, mongodb_handler: MongoDBHandler, wsa_handler: WsaHandler, wix_order_handler: WixOrderHandler):
+    def __init__(self, cws_handler: CwsHandler, mongodb_handler: MongoDBHandler, wsa_handler: WsaHandler, wix_order_handler: WixOrderHandler, job_journal: JobJournal = None):
         self.cws_handler = cws_handler
         self.mongodb_handler = mongodb_handler
         self.wsa_handler = wsa_handler
         self.wix_order_handler = wix_order_handler
 
+        if job_journal is None:
+            job_journal = JobJournal(os.path.join("cache", "job_journal.jsonl"))
+
+        self.job_journal = job_journal
+
 ########################################
 
     # CwsHandler, MongoDBHandler, WixOrderHandler
     def ecommerce_pre_postagem_nova(self, order_number: str) -> None:
-        order = self.wix_order_handler.get_order(order_number)
+        order = self.wix_order_handler.get_order_model(order_number)
 
         if not order:
             raise ValueError
 
-        correios_pre_postagem = self.correios_pre_postagem_nova(
-            order_number
+        state = self.job_journal.state(order.number)
+
+        # Steps an interrupted run already finished are not repeated
+        # The journal drops the CWS payload once it is stored in Mongo
+        if "pre_postagem" in state["step_list"]:
+            correios_pre_postagem = dict(state.get("pre_postagem", {}))
+            codigo_objeto = state.get("codigo_objeto")
+        else:
+            correios_pre_postagem = self.cws_handler.pre_postagem_nova(
+                self._correios_pre_postagem_json_data(order)
+            )
+            codigo_objeto = correios_pre_postagem.get("codigoObjeto")
+
+            self.job_journal.record(
+                order.number,
+                "pre_postagem",
+                sync=True,
+                pre_postagem=correios_pre_postagem,
+                codigo_objeto=codigo_objeto
+            )
+
+        if "mongodb" not in state["step_list"]:
+            # Keyed on codigoObjeto, a rerun after a crash here is a no-op
+            pre_postagem_id = self.mongodb_handler.collection_upsert_many(
+                "ecommerce", "pre_postagem", "codigoObjeto", [correios_pre_postagem]
+            )[0]
+
+            if pre_postagem_id is None:
+                raise ValueError(codigo_objeto)
+
+            pre_postagem_id = str(pre_postagem_id)
+
+            self.job_journal.record(
+                order.number, "mongodb", sync=True, pre_postagem_id=pre_postagem_id
+            )
+
+        if "wix_fulfillment" not in state["step_list"]:
+            self._wix_order_fulfillment_create(order, codigo_objeto)
+
+            self.job_journal.record(order.number, "wix_fulfillment", sync=True)
+
+    # CwsHandler, MongoDBHandler, WixOrderHandler
+    def ecommerce_pre_postagem_nova_many(self, order_numbers: List[str], max_workers: int = 8) -> List[dict]:
+        result_list = self._pre_postagem_batch_result_list(order_numbers)
+        state_list = self._pre_postagem_batch_state_list(result_list)
+
+        order_list = [
+            self.wix_order_handler.get_order_model(order_number)
+            for order_number in order_numbers
+        ]
+
+        # Resolves every CEP once, payload building below then hits the cache
+        self.cws_handler.cep_endereco_many([
+            self._wix_order_zip_code(order)
+            for order, state in zip(order_list, state_list)
+            if order and "pre_postagem" not in state["step_list"]
+        ])
+
+        json_data_list = self._pre_postagem_batch_json_data(
+            order_list, result_list, state_list
+        )
+
+        correios_pre_postagem_dict = self._pre_postagem_batch_journaled(
+            state_list
         )
 
-        codigo_objeto = correios_pre_postagem.get("codigoObjeto")
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            # Each worker journals its own pre-postagem as soon as CWS returns
+            future_dict = {
+                index: executor.submit(
+                    self._pre_postagem_batch_nova, index, json_data, result_list
+                )
+                for index, json_data in enumerate(json_data_list) if json_data
+            }
+
+            for index, future in future_dict.items():
+                try:
+                    correios_pre_postagem_dict[index] = future.result()
+
+                except Exception as error:
+                    result_list[index]["error"] = self._batch_error(
+                        "pre_postagem", error
+                    )
+
+            fulfillment_index_list = self._pre_postagem_batch_fulfillment_pending(
+                order_list, state_list
+            )
+
+            if len(correios_pre_postagem_dict) > 0:
+                correios_pre_postagem_dict = dict(sorted(correios_pre_postagem_dict.items()))
+
+                fulfillment_index_list += [
+                    index
+                    for index in self._pre_postagem_batch_insert(correios_pre_postagem_dict, result_list)
+                    if order_list[index]
+                ]
+
+            future_dict = {
+                index: executor.submit(
+                    self._wix_order_fulfillment_create,
+                    order_list[index],
+                    result_list[index]["codigo_objeto"]
+                )
+                for index in fulfillment_index_list
+            }
+
+            for index, future in future_dict.items():
+                try:
+                    future.result()
+
+                    self.job_journal.record(
+                        result_list[index]["order_number"], "wix_fulfillment"
+                    )
+
+                except Exception as error:
+                    result_list[index]["error"] = self._batch_error(
+                        "wix_fulfillment", error
+                    )
+
+        self.job_journal.sync()
+
+        return result_list
+
+    # CwsHandler, MongoDBHandler, WixOrderHandler
+    async def ecommerce_pre_postagem_nova_many_async(self, order_numbers: List[str], max_in_flight: int = 100) -> List[dict]:
+        result_list = self._pre_postagem_batch_result_list(order_numbers)
+        state_list = self._pre_postagem_batch_state_list(result_list)
+
+        order_list = [
+            self.wix_order_handler.get_order_model(order_number)
+            for order_number in order_numbers
+        ]
+
+        await self.cws_handler.cep_endereco_many_async([
+            self._wix_order_zip_code(order)
+            for order, state in zip(order_list, state_list)
+            if order and "pre_postagem" not in state["step_list"]
+        ])
+
+        # Payload building looks up the service catalog and the CEP cache
+        json_data_list = await asyncio.to_thread(
+            self._pre_postagem_batch_json_data, order_list, result_list, state_list
+        )
+
+        semaphore = asyncio.Semaphore(max_in_flight)
+
+        async def pre_postagem_nova(index: int) -> None:
+            async with semaphore:
+                try:
+                    correios_pre_postagem = await self.cws_handler.pre_postagem_nova_async(
+                        json_data_list[index]
+                    )
+
+                    # The fsync blocks, keep it off the event loop
+                    await asyncio.to_thread(
+                        self._pre_postagem_batch_record, index, correios_pre_postagem, result_list
+                    )
+
+                    correios_pre_postagem_dict[index] = correios_pre_postagem
+
+                except Exception as error:
+                    result_list[index]["error"] = self._batch_error(
+                        "pre_postagem", error
+                    )
+
+        async def wix_order_fulfillment_create(index: int) -> None:
+            async with semaphore:
+                try:
+                    await self.wix_order_handler.order_fulfillment_create_async(
+                        order_list[index].id,
+                        self._wix_order_fulfillment(
+                            order_list[index],
+                            result_list[index]["codigo_objeto"]
+                        )
+                    )
+
+                    self.job_journal.record(
+                        result_list[index]["order_number"], "wix_fulfillment"
+                    )
+
+                except Exception as error:
+                    result_list[index]["error"] = self._batch_error(
+                        "wix_fulfillment", error
+                    )
+
+        correios_pre_postagem_dict = self._pre_postagem_batch_journaled(
+            state_list
+        )
+
+        await asyncio.gather(*[
+            pre_postagem_nova(index)
+            for index, json_data in enumerate(json_data_list) if json_data
+        ])
+
+        fulfillment_index_list = self._pre_postagem_batch_fulfillment_pending(
+            order_list, state_list
+        )
+
+        if len(correios_pre_postagem_dict) > 0:
+            # Keep the payload order stable for the Mongo ids
+            correios_pre_postagem_dict = dict(sorted(correios_pre_postagem_dict.items()))
+
+            inserted_index_list = await asyncio.to_thread(
+                self._pre_postagem_batch_insert, correios_pre_postagem_dict, result_list
+            )
+
+            fulfillment_index_list += [
+                index for index in inserted_index_list if order_list[index]
+            ]
+
+        await asyncio.gather(*[
+            wix_order_fulfillment_create(index) for index in fulfillment_index_list
+        ])
+
+        await asyncio.to_thread(self.job_journal.sync)
+
+        return result_list
+
+    # CwsHandler, MongoDBHandler, WixOrderHandler
+    def ecommerce_pipeline_envio(self, order_query_filter: OrderQueryFilter = None, max_workers: int = 4, queue_size: int = 32) -> List[dict]:
+        if order_query_filter is None:
+            order_query_filter = OrderQueryFilter(
+                payment_status=PaymentStatus.PAID,
+                fulfillment_status=FulfillmentStatus.NOT_FULFILLED
+            )
+
+        def cep_endereco(item: dict) -> None:
+            self.cws_handler.cep_endereco(self._wix_order_zip_code(item["order"]))
+
+        def pre_postagem_nova(item: dict) -> None:
+            state = self.job_journal.state(item["order_number"])
+
+            if "pre_postagem" in state["step_list"]:
+                item["pre_postagem"] = dict(state.get("pre_postagem", {}))
+                item["codigo_objeto"] = state.get("codigo_objeto")
+
+                return
+
+            item["pre_postagem"] = self.cws_handler.pre_postagem_nova(
+                self._correios_pre_postagem_json_data(item["order"])
+            )
+            item["codigo_objeto"] = item["pre_postagem"].get("codigoObjeto")
+
+            self.job_journal.record(
+                item["order_number"],
+                "pre_postagem",
+                sync=True,
+                pre_postagem=item["pre_postagem"],
+                codigo_objeto=item["codigo_objeto"]
+            )
+
+        def mongodb_insert(item: dict) -> None:
+            state = self.job_journal.state(item["order_number"])
+
+            if "mongodb" in state["step_list"]:
+                item["pre_postagem_id"] = state.get("pre_postagem_id")
+            else:
+                item["pre_postagem_id"] = self.mongodb_handler.collection_upsert_many(
+                    "ecommerce", "pre_postagem", "codigoObjeto", [item["pre_postagem"]]
+                )[0]
+
+                if item["pre_postagem_id"] is None:
+                    raise ValueError(item["codigo_objeto"])
+
+                item["pre_postagem_id"] = str(item["pre_postagem_id"])
+
+                self.job_journal.record(
+                    item["order_number"], "mongodb", pre_postagem_id=item["pre_postagem_id"]
+                )
+
+            del item["pre_postagem"]
+
+        def wix_fulfillment(item: dict) -> None:
+            if self.job_journal.done(item["order_number"], "wix_fulfillment"):
+                return
+
+            self._wix_order_fulfillment_create(
+                item["order"], item["codigo_objeto"]
+            )
+
+            self.job_journal.record(item["order_number"], "wix_fulfillment")
+
+        def on_error(item: dict, stage: PipelineStage, error: Exception) -> None:
+            item["error"] = self._batch_error(stage.name, error)
+
+        pipeline = Pipeline(
+            [
+                PipelineStage("cep", cep_endereco, max_workers, queue_size),
+                PipelineStage("pre_postagem", pre_postagem_nova, max_workers, queue_size),
+                PipelineStage("mongodb", mongodb_insert, 1, queue_size),
+                PipelineStage("wix_fulfillment", wix_fulfillment, max_workers, queue_size)
+            ],
+            on_error
+        )
+
+        started_at = time.monotonic()
+        cep_cache_stats = self.cws_handler.cep_cache_stats()
+
+        skipped_list = []
+
+        def source() -> Iterable[dict]:
+            for order in self.wix_order_handler.order_query_iter(order_query_filter):
+                order = WixOrder(order)
+
+                # Pickup orders are paid and not fulfilled too, but never posted
+                skip_reason = self._wix_order_envio_skip_reason(order)
+
+                if skip_reason:
+                    skipped_list.append(
+                        {"order_number": order.number, "skip_reason": skip_reason}
+                    )
+
+                    continue
+
+                yield {
+                    "order": order,
+                    "order_number": order.number,
+                    "codigo_objeto": None,
+                    "pre_postagem_id": None,
+                    "error": None
+                }
+
+        # Orders enter the first stage while later query pages are still loading
+        item_list = pipeline.run(source())
+
+        self.job_journal.sync()
+        self.cws_handler.cep_cache_flush()
+
+        # Every order is already shipped here, a slow receipt must not lose that
+        try:
+            pdf_path = self._pre_postagem_rotulo_download([
+                item["codigo_objeto"] for item in item_list if not item["error"]
+            ])
+
+        except Exception as error:
+            pdf_path = self._batch_error("rotulo", error)
+
+        elapsed = time.monotonic() - started_at
+
+        table = PrettyTable()
+        table.align = "l"
+        table.header = True
+
+        table.field_names = ["Stage", "Orders", "Errors", "Busy (s)", "Elapsed (s)", "Orders/s"]
+
+        for stage_metrics in pipeline.metrics():
+            table.add_row([
+                stage_metrics["name"],
+                stage_metrics["count"],
+                stage_metrics["error_count"],
+                f"{stage_metrics['busy_seconds']:.1f}",
+                f"{stage_metrics['elapsed_seconds']:.1f}",
+                f"{stage_metrics['throughput']:.2f}"
+            ])
+
+        # The cache counters live as long as the process, only this run's share is shown
+        cep_cache_stats = {
+            key: value - cep_cache_stats[key]
+            for key, value in self.cws_handler.cep_cache_stats().items()
+        }
 
-        pre_postagem_id = self.mongodb_handler.collection_insert(
-            "ecommerce", "pre_postagem", correios_pre_postagem
+        print(table)
+        print(
+            f"Orders: {len(item_list)}, Shipped: {len([item for item in item_list if not item['error']])}, Failed: {len([item for item in item_list if item['error']])}, Skipped: {len(skipped_list)}, Elapsed: {elapsed:.1f}s, Labels: {pdf_path}"
         )
 
-        self.wix_order_fulfillment_create(
-            order_number, codigo_objeto
+        for skipped in skipped_list:
+            print(f"Skipped {skipped['order_number']}: {skipped['skip_reason']}")
+        print(
+            f"CEP cache hits: {cep_cache_stats['hits']}, misses: {cep_cache_stats['misses']}"
         )
 
+        return [
+            {key: value for key, value in item.items() if key != "order"}
+            for item in item_list
+        ]
+
     # CwsHandler , WixOrderHandler
     def ecommerce_pre_postagem_cancela(self, order_number: str) -> None:
         order = self.wix_order_handler.get_order(order_number)
@@ -67,103 +443,77 @@ class Ecommerce:
             order_number
         )
 
+        self.job_journal.record(str(order.get("number")), "cancela", sync=True)
+
 ########################################
 
     # CwsHandler, WixOrderHandler, WsaHandler
     def correios_enderecador_encomendas(self) -> list:
-        json_path = os.path.join(
-            "openapi_example_value", "cws_pre_postagem.json"
-        )
-
-        with open(json_path, "r", encoding="utf-8") as file:
-            json_data = json.load(file)
-
-        json_data_remetente = json_data.get("remetente", {})
-        json_data_remetente_endereco = json_data_remetente.get("endereco", {})
-
-        remetente = {
-            "nome": json_data_remetente.get("nome"),
-            "cpf_cnpj": json_data_remetente.get("cpfCnpj"),
-            "logradouro": json_data_remetente_endereco.get("logradouro"),
-            "numero": json_data_remetente_endereco.get("numero"),
-            "complemento": json_data_remetente_endereco.get("complemento"),
-            "bairro": json_data_remetente_endereco.get("bairro"),
-            "cidade": json_data_remetente_endereco.get("cidade"),
-            "estado": json_data_remetente_endereco.get("uf"),
-            "cep": json_data_remetente_endereco.get("cep")
-        }
-
-        order_list = self.wix_order_handler.get_order_list()
-
-        group_size = 4
-        destinatario_list = []
-        file_list = []
+        order_list = self.wix_order_handler.get_order_model_list()
 
-        for index, order in enumerate(order_list):
-            billing_info = order.get("billingInfo", {})
-            shipping_info = order.get("shippingInfo", {})
-            shipment_details = shipping_info.get("shipmentDetails", {})
-
-            if len(shipment_details) > 0:
-                cpf = billing_info.get("vatId", {}).get("number", "")
+        cep_endereco_dict = self.cws_handler.cep_endereco_many(
+            [self._wix_order_zip_code(order) for order in order_list]
+        )
 
-                if len(cpf) == 0:
-                    cpf_cnpj = "34990164865"
-                else:
-                    cpf_cnpj = cpf
+        grupo_list = self._correios_enderecador_encomendas_grupos(
+            order_list, cep_endereco_dict
+        )
 
-                address = shipment_details.get("address", {})
+        # Groups run side by side, a slow one no longer holds up the rest
+        with ThreadPoolExecutor(max_workers=self.wsa_handler.enderecador_max_workers) as executor:
+            file_list = list(executor.map(
+                self.wsa_handler.correios_enderecador_encomendas, grupo_list
+            ))
+
+        # WsaClient returns None for a failed group, each one is retried alone
+        for _ in range(self.wsa_handler.enderecador_retries):
+            for index, remetente_destinatario_list_dict in enumerate(grupo_list):
+                if file_list[index] is None:
+                    file_list[index] = self.wsa_handler.correios_enderecador_encomendas(
+                        remetente_destinatario_list_dict
+                    )
 
-                first_name = address.get("fullName", {}).get(
-                    "firstName", ""
-                ).strip()
+        return file_list
 
-                last_name = address.get("fullName", {}).get(
-                    "lastName", ""
-                ).strip()
+    # CwsHandler, WixOrderHandler, WsaHandler
+    def correios_enderecador_encomendas_local(self) -> str:
+        order_list = self.wix_order_handler.get_order_model_list()
 
-                endereco = self.cws_handler.cep_endereco(
-                    address.get("zipCode")
-                )
+        cep_endereco_dict = self.cws_handler.cep_endereco_many(
+            [self._wix_order_zip_code(order) for order in order_list]
+        )
 
-                cep = f"{endereco.get('cep', '')[:-3]}-{endereco.get('cep', '')[-3:]}"
+        pdf_path = os.path.join(
+            "downloads",
+            f"enderecador_encomendas-{datetime.now().strftime('%Y%m%d%H%M%S')}.pdf"
+        )
 
-                peso_total = order.get("totals", {}).get(
-                    "weight"
-                ).replace(".", ",")
+        return self.wsa_handler.correios_enderecador_encomendas_local(
+            self._correios_enderecador_encomendas_grupos(order_list, cep_endereco_dict),
+            pdf_path
+        )
 
-                destinatario = {
-                    "id": f"{order.get('number', '')}",
-                    "nome": f"{first_name} {last_name}",
-                    "cpf_cnpj": f"{cpf_cnpj}",
-                    "logradouro": f"{address.get('street', {}).get('name', '')}",
-                    "numero": f"{address.get('street', {}).get('number', '')}",
-                    "complemento": f"{address.get('addressLine2', '')}",
-                    "bairro": f"{endereco.get('bairro', '')}",
-                    "cidade": f"{endereco.get('localidade', '')}",
-                    "estado": f"{endereco.get('uf', '')}",
-                    "cep": cep,
-                    "itens_declaracao_conteudo": self._wix_order_itens_declaracao_conteudo(order),
-                    "peso_total": f"{peso_total}"
-                }
+    # CwsHandler, WixOrderHandler, WsaHandler
+    async def correios_enderecador_encomendas_async(self) -> list:
+        order_list = self.wix_order_handler.get_order_model_list()
 
-                destinatario_list.append(destinatario)
+        cep_endereco_dict = await self.cws_handler.cep_endereco_many_async(
+            [self._wix_order_zip_code(order) for order in order_list]
+        )
 
-            if len(order_list) == index + 1 or len(destinatario_list) == group_size:
-                remetente_destinatario_list_dict = {
-                    "remetente": remetente,
-                    "destinatario": destinatario_list
-                }
+        # Same bound as the thread pool in correios_enderecador_encomendas
+        semaphore = asyncio.Semaphore(self.wsa_handler.enderecador_max_workers)
 
-                response = self.wsa_handler.correios_enderecador_encomendas(
+        async def correios_enderecador_encomendas(remetente_destinatario_list_dict: dict):
+            async with semaphore:
+                return await self.wsa_handler.correios_enderecador_encomendas_async(
                     remetente_destinatario_list_dict
                 )
 
-                file_list.append(response)
-
-                destinatario_list = []
-
-        return file_list
+        return await asyncio.gather(*[
+            correios_enderecador_encomendas(remetente_destinatario_list_dict)
+            for remetente_destinatario_list_dict in self._correios_enderecador_encomendas_grupos(order_list, cep_endereco_dict)
+        ])
 
 ########################################
 
@@ -175,138 +525,77 @@ class Ecommerce:
 
     # CwsHandler, WixOrderHandler
     def correios_pre_postagem_nova(self, order_number: str) -> dict:
-        order = self.wix_order_handler.get_order(order_number)
+        order = self.wix_order_handler.get_order_model(order_number)
 
         if not order:
             raise ValueError
 
-        json_path = os.path.join(
-            "openapi_example_value", "cws_pre_postagem.json"
+        return self.cws_handler.pre_postagem_nova(
+            self._correios_pre_postagem_json_data(order)
         )
 
-        with open(json_path, "r", encoding="utf-8") as file:
-            json_data = json.load(file)
-
-        json_data["destinatario"] = self._wix_order_destinatario(order)
-        json_data["codigoServico"] = self._wix_order_codigo_servico(order)
-
-        json_data["listaServicoAdicional"][0]["codigoServicoAdicional"] = self._wix_order_codigo_servico_adicional(
-            order
-        )
-
-        json_data["listaServicoAdicional"][0]["valorDeclarado"] = self._wix_order_valor_declarado(
-            order
-        )
-
-        json_data["itensDeclaracaoConteudo"] = self._wix_order_itens_declaracao_conteudo(
-            order
-        )
-
-        json_data["pesoInformado"] = self._wix_order_peso_informado(order)
-
-        json_data["observacao"] = f"number:{order_number}"
-
-        return self.cws_handler.pre_postagem_nova(json_data)
-
     # CwsHandler, WixOrderHandler
     def correios_pre_postagem_cancela(self, order_number: str) -> None:
-        order = self.wix_order_handler.get_order(order_number)
+        order = self.wix_order_handler.get_order_model(order_number)
 
         if not order:
             raise ValueError
 
-        fulfillments = order.get("fulfillments", [])
-
-        if len(fulfillments) > 0:
-            for fulfillment in fulfillments:
-                tracking_info = fulfillment.get("trackingInfo")
-                tracking_number = tracking_info.get("trackingNumber", None)
-
-                if tracking_number:
-                    self.cws_handler.pre_postagem_cancela(
-                        codigo_objeto=tracking_number
-                    )
+        for tracking_number in order.tracking_number_list:
+            self.cws_handler.pre_postagem_cancela(
+                codigo_objeto=tracking_number
+            )
 
     # CwsHandler, WixOrderHandler
     def correios_pre_postagem_download_declaracao_conteudo(self, order_number: str) -> str:
-        order = self.wix_order_handler.get_order(order_number)
+        order = self.wix_order_handler.get_order_model(order_number)
 
         if not order:
             raise ValueError
 
-        number = order.get("number", "")
-        fulfillments = order.get("fulfillments", [])
-
-        if len(fulfillments) > 0:
-            for fulfillment in fulfillments:
-                tracking_info = fulfillment.get("trackingInfo")
-                tracking_number = tracking_info.get("trackingNumber", None)
-
-                if tracking_number:
-                    pre_postagem_query_filter = PrePostagemQueryFilter(
-                        codigo_objeto=tracking_number
-                    )
+        for tracking_number in order.tracking_number_list:
+            pre_postagem_query_filter = PrePostagemQueryFilter(
+                codigo_objeto=tracking_number
+            )
 
-                    pre_postagem_list = self.cws_handler.lista_pre_postagem(
-                        pre_postagem_query_filter
-                    )
+            pre_postagem_list = self.cws_handler.lista_pre_postagem(
+                pre_postagem_query_filter
+            )
 
-                    if len(pre_postagem_list) > 0:
-                        id_pre_postagem = pre_postagem_list[0].get("id")
+            if len(pre_postagem_list) > 0:
+                id_pre_postagem = pre_postagem_list[0].get("id")
 
-                        html_content = self.cws_handler.pre_postagem_declaracao_conteudo(
-                            id_pre_postagem
-                        )
+                html_content = self.cws_handler.pre_postagem_declaracao_conteudo(
+                    id_pre_postagem
+                )
 
-                        if html_content:
-                            html_path = os.path.join(
-                                "downloads",
-                                f"{number}-{tracking_number}.html"
-                            )
+                if html_content:
+                    html_path = os.path.join(
+                        "downloads",
+                        f"{order.number}-{tracking_number}.html"
+                    )
 
-                            with open(html_path, "w", encoding="utf-8") as file:
-                                file.write(html_content)
+                    with open(html_path, "w", encoding="utf-8") as file:
+                        file.write(html_content)
 
-                            return html_path
+                    return html_path
 
         return ""
 
     # CwsHandler, WixOrderHandler
     def correios_pre_postagem_download_rotulo(self) -> str:
-        order_list = self.wix_order_handler.get_order_list()
+        order_list = self.wix_order_handler.get_order_model_list()
 
         if not order_list:
             raise ValueError
 
-        codigo_objeto_list = []
-
-        for order in order_list:
-            fulfillments = order.get("fulfillments", [])
-
-            if len(fulfillments) > 0:
-                for fulfillment in fulfillments:
-                    tracking_info = fulfillment.get("trackingInfo")
-                    tracking_number = tracking_info.get("trackingNumber", None)
-                    codigo_objeto_list.append(tracking_number)
-
-        if len(codigo_objeto_list) > 0:
-            pdf = self.cws_handler.pre_postagem_rotulo(codigo_objeto_list)
-
-            pdf_filename = pdf.get("nome", None)
-            pdf_content = pdf.get("dados", None)
-
-            if pdf_filename and pdf_content:
-                pdf_path = os.path.join(
-                    "downloads",
-                    pdf_filename
-                )
-
-                with open(pdf_path, "wb") as pdf_file:
-                    pdf_file.write(base64.b64decode(pdf_content))
-
-                return pdf_path
+        codigo_objeto_list = [
+            tracking_number
+            for order in order_list
+            for tracking_number in order.tracking_number_list
+        ]
 
-        return ""
+        return self._pre_postagem_rotulo_download(codigo_objeto_list)
 
 ########################################
 
@@ -317,36 +606,32 @@ class Ecommerce:
         )
 
     # WixOrderHandler
-    def wix_order_fulfillment_create(self, order_number: str, tracking_number: str) -> None:
-        order = self.wix_order_handler.get_order(order_number)
+    def wix_order_sync(self) -> dict:
+        order_sync_result = self.wix_order_handler.order_sync()
 
-        if not order:
-            raise ValueError
+        print(
+            f"Added: {len(order_sync_result['added'])}, Changed: {len(order_sync_result['changed'])}"
+        )
 
-        line_items = order.get("lineItems", [])
+        return order_sync_result
 
-        fulfillment_line_items_list = []
+    # WixOrderHandler
+    def wix_order_snapshot_load(self, order_query_filter: OrderQueryFilter = None) -> None:
+        self.wix_order_handler.order_store_load(order_query_filter)
 
-        for item in line_items:
-            index = item.get("index")
-            product_id = item.get("productId")
-            quantity = item.get("quantity")
+    # WixOrderHandler
+    def wix_order_fulfillment_create(self, order_number: str, tracking_number: str) -> None:
+        order = self.wix_order_handler.get_order_model(order_number)
 
-            fulfillment_line_items_list.append({
-                "index": index,
-                "quantity": quantity
-            })
+        if not order:
+            raise ValueError
 
-        order_fulfillment = OrderFulfillment(
-            tracking_info_shipping_provider="Correios",
-            tracking_info_tracking_number=tracking_number,
-            tracking_info_tracking_link=f"https://www.websro.com.br/rastreamento-correios.php?P_COD_UNI={tracking_number}",
-            line_items=fulfillment_line_items_list
-        )
+        self._wix_order_fulfillment_create(order, tracking_number)
 
+    def _wix_order_fulfillment_create(self, order: WixOrder, tracking_number: str) -> None:
         self.wix_order_handler.order_fulfillment_create(
-            order.get("id"),
-            order_fulfillment
+            order.id,
+            self._wix_order_fulfillment(order, tracking_number)
         )
 
     # WixOrderHandler
@@ -367,44 +652,68 @@ class Ecommerce:
 
     # WixOrderHandler
     def wix_estoque_tabela_retirada_produtos(self) -> None:
-        orders = self.wix_order_handler.get_order_list()
+        orders = self.wix_order_handler.get_order_model_list()
 
         product_quantities = {}
 
         for order in orders:
-            line_items = order.get("lineItems")
+            for item in order.line_items:
+                if item.product_id in product_quantities:
+                    product_quantities[item.product_id]['quantity'] += item.quantity
+                else:
+                    product_quantities[item.product_id] = {
+                        'productId': item.product_id, 'name': item.name, 'quantity': item.quantity}
 
-            for item in line_items:
-                product_id = item.get("productId")
-                name = item.get("name")
-                quantity = item.get("quantity", 0)
+        print(
+            f"Order number: {self.wix_order_handler.get_order_number_list_string()}\n"
+        )
+        print(self._estoque_tabela_retirada_produtos(product_quantities.values()))
 
-                if product_id in product_quantities:
-                    product_quantities[product_id]['quantity'] += quantity
-                else:
-                    product_quantities[product_id] = {
-                        'productId': product_id, 'name': name, 'quantity': quantity}
+    # MongoDBHandler
+    def mongodb_estoque_tabela_retirada_produtos(self, date_created: Dict[FilterOperator, str] = None, payment_status: PaymentStatus = None, fulfillment_status: FulfillmentStatus = None) -> None:
+        match = {}
 
-        table = PrettyTable()
-        table.align = "l"
-        table.header = True
+        if date_created:
+            match["dateCreated"] = {
+                operator.value: timestamp for operator, timestamp in date_created.items()
+            }
 
-        table.field_names = ["Product ID", "Name", "Quantity"]
+        if payment_status:
+            match["paymentStatus"] = payment_status.value
 
-        # Iterate over the data and add rows to the table
-        for product_id, product_info in product_quantities.items():
-            table.add_row([
-                product_info["productId"], product_info["name"], product_info["quantity"]
-            ])
+        if fulfillment_status:
+            match["fulfillmentStatus"] = fulfillment_status.value
 
-        print(
-            f"Order number: {self.wix_order_handler.get_order_number_list_string()}\n"
-        )
-        print(table)
+        pipeline = [
+            {"$match": match},
+            {"$unwind": "$lineItems"},
+            {
+                "$group": {
+                    "_id": "$lineItems.productId",
+                    "name": {"$first": "$lineItems.name"},
+                    "quantity": {"$sum": "$lineItems.quantity"}
+                }
+            },
+            {"$sort": {"name": 1}},
+            {
+                "$project": {
+                    "_id": 0,
+                    "productId": "$_id",
+                    "name": 1,
+                    "quantity": 1
+                }
+            }
+        ]
+
+        print(self._estoque_tabela_retirada_produtos(
+            self.mongodb_handler.collection_aggregate(
+                "ecommerce", "wix_order", pipeline
+            )
+        ))
 
     # CwsHandler, WixOrderHandler
     def wix_pedidos_tabela_enderecos_inconsistentes(self) -> None:
-        order_list = self.wix_order_handler.get_order_list()
+        order_list = self.wix_order_handler.get_order_model_list()
 
         table = PrettyTable()
         table.align = "l"
@@ -427,33 +736,24 @@ class Ecommerce:
 
         tabular_data = []
 
-        for index, order in enumerate(order_list):
-            shipping_info = order.get("shippingInfo", {})
-            shipment_details = shipping_info.get("shipmentDetails", {})
+        cep_endereco_dict = self.cws_handler.cep_endereco_many(
+            [self._wix_order_zip_code(order) for order in order_list]
+        )
 
-            if len(shipment_details) == 0:
+        for index, order in enumerate(order_list):
+            if not order.shipping_info.shipment_details:
                 continue
 
-            address = shipment_details.get("address", {})
+            address = order.shipping_info.address
 
-            first_name = address.get("fullName", {}).get(
-                "firstName", ""
-            ).strip()
+            wix_number = order.number
+            wix_nome = address.first_name.strip()
+            wix_logradouro = address.street_name
+            wix_numero = address.street_number
+            wix_cidade = address.city
+            wix_estado = address.subdivision
 
-            last_name = address.get("fullName", {}).get(
-                "lastName", ""
-            ).strip()
-
-            wix_number = order.get("number", "")
-            wix_nome = first_name
-            wix_logradouro = address.get("street", {}).get("name", "")
-            wix_numero = address.get("street", {}).get("number", "")
-            wix_cidade = address.get("street", {}).get("city", "")
-            wix_estado = address.get("street", {}).get("subdivision", "")
-
-            cws_cep_endereco = self.cws_handler.cep_endereco(
-                address.get("zipCode")
-            )
+            cws_cep_endereco = cep_endereco_dict.get(address.zip_code)
 
             if not cws_cep_endereco:
                 cws_cep_endereco = {}
@@ -478,17 +778,40 @@ class Ecommerce:
                     cws_cidade,
                 ])
 
+        cep_cache_stats = self.cws_handler.cep_cache_stats()
+
         print(
             f"Order number: {self.wix_order_handler.get_order_number_list_string()}\n"
         )
         print(table)
+        print(
+            f"CEP cache hits: {cep_cache_stats['hits']}, misses: {cep_cache_stats['misses']}, size: {cep_cache_stats['size']}"
+        )
+
+########################################
+
+    def circuit_breaker_tabela_estado(self) -> None:
+        table = PrettyTable()
+        table.align = "l"
+        table.header = True
+
+        table.field_names = ["Endpoint", "State", "Open"]
+
+        for circuit_breaker_state in circuit_breaker_registry.state_list():
+            table.add_row([
+                circuit_breaker_state["name"],
+                circuit_breaker_state["state"],
+                circuit_breaker_state["open"]
+            ])
+
+        print(table)
 
 ########################################
 
     # MongoDBHandler
     def mongodb_pre_postagem_collection_create(self) -> None:
         self.mongodb_handler.collection_create(
-            "ecommerce", "pre_postagem"
+            "ecommerce", "pre_postagem", PRE_POSTAGEM_INDEX_LIST
         )
 
     # MongoDBHandler
@@ -504,7 +827,7 @@ class Ecommerce:
     # MongoDBHandler
     def mongodb_wix_order_collection_create(self) -> None:
         self.mongodb_handler.collection_create(
-            "ecommerce", "wix_order"
+            "ecommerce", "wix_order", WIX_ORDER_INDEX_LIST
         )
 
     # MongoDBHandler
@@ -517,46 +840,358 @@ class Ecommerce:
     def mongodb_wix_order_collection_list(self):
         return self.mongodb_handler.collection_list("ecommerce", "wix_order")
 
+    # MongoDBHandler
+    def mongodb_wix_order_export_jsonl(self, path: str, resume_after_id: Any = None) -> dict:
+        return self.mongodb_handler.collection_export_jsonl(
+            "ecommerce", "wix_order", path, resume_after_id=resume_after_id
+        )
+
+    # MongoDBHandler
+    def mongodb_wix_order_export_csv(self, path: str, resume_after_id: Any = None) -> dict:
+        return self.mongodb_handler.collection_export_csv(
+            "ecommerce", "wix_order", path, [
+                "id",
+                "number",
+                "dateCreated",
+                "lastUpdated",
+                "paymentStatus",
+                "fulfillmentStatus",
+                "totals.subtotal",
+                "totals.total",
+                "totals.weight",
+                "shippingInfo.deliveryOption",
+                "shippingInfo.shipmentDetails.address.zipCode"
+            ],
+            resume_after_id=resume_after_id
+        )
+
+    # MongoDBHandler
+    def mongodb_tabela_uso_indices(self) -> None:
+        table = PrettyTable()
+        table.align = "l"
+        table.header = True
+
+        table.field_names = ["Collection", "Index", "Ops", "Since"]
+
+        for collection_name in ["pre_postagem", "wix_order"]:
+            for index_stats in self.mongodb_handler.collection_index_stats("ecommerce", collection_name):
+                accesses = index_stats.get("accesses", {})
+
+                table.add_row([
+                    collection_name,
+                    index_stats.get("name"),
+                    accesses.get("ops"),
+                    accesses.get("since")
+                ])
+
+        print(table)
+
     # MongoDBHandler, WixOrderHandler
-    def mongodb_wix_order_replicate(self):
+    def mongodb_wix_order_replicate(self) -> dict:
         order_list = self.wix_order_handler.get_order_list()
 
-        self.mongodb_handler.wix_order_replicate(
+        summary = self.mongodb_handler.wix_order_replicate(
             "ecommerce", "wix_order", order_list
         )
 
+        print(
+            f"Matched: {summary['matched']}, Upserted: {summary['upserted']}, Modified: {summary['modified']}, Skipped: {summary['skipped']}"
+        )
+
+        return summary
+
 
 ########################################
 
 
-    def _wix_order_destinatario(self, order: dict) -> dict:
-        number = order.get("number", "")
-        shipping_info = order.get("shippingInfo", "")
-        shipment_details = shipping_info.get("shipmentDetails", "")
-        address = shipment_details.get("address", "")
+    def _estoque_tabela_retirada_produtos(self, product_info_iter: Iterable[dict]) -> PrettyTable:
+        table = PrettyTable()
+        table.align = "l"
+        table.header = True
+
+        table.field_names = ["Product ID", "Name", "Quantity"]
+
+        # Iterate over the data and add rows to the table
+        for product_info in product_info_iter:
+            table.add_row([
+                product_info["productId"], product_info["name"], product_info["quantity"]
+            ])
+
+        return table
+
+    def _pre_postagem_batch_result_list(self, order_numbers: List[str]) -> List[dict]:
+        return [
+            {
+                "order_number": str(order_number),
+                "codigo_objeto": None,
+                "pre_postagem_id": None,
+                "error": None
+            }
+            for order_number in order_numbers
+        ]
+
+    def _pre_postagem_batch_state_list(self, result_list: List[dict]) -> List[dict]:
+        state_list = []
+
+        for result in result_list:
+            state = self.job_journal.state(result["order_number"])
+
+            result["codigo_objeto"] = state.get("codigo_objeto")
+            result["pre_postagem_id"] = state.get("pre_postagem_id")
+
+            state_list.append(state)
+
+        return state_list
+
+    def _pre_postagem_batch_journaled(self, state_list: List[dict]) -> Dict[int, dict]:
+        # Pre-postagens an interrupted run created but never stored in Mongo
+        return {
+            index: dict(state["pre_postagem"])
+            for index, state in enumerate(state_list)
+            if "pre_postagem" in state["step_list"] and "mongodb" not in state["step_list"]
+        }
+
+    def _pre_postagem_batch_fulfillment_pending(self, order_list: List[WixOrder], state_list: List[dict]) -> List[int]:
+        return [
+            index
+            for index, (order, state) in enumerate(zip(order_list, state_list))
+            if order and "mongodb" in state["step_list"] and "wix_fulfillment" not in state["step_list"]
+        ]
+
+    def _pre_postagem_batch_nova(self, index: int, json_data: dict, result_list: List[dict]) -> dict:
+        correios_pre_postagem = self.cws_handler.pre_postagem_nova(json_data)
+
+        self._pre_postagem_batch_record(index, correios_pre_postagem, result_list)
+
+        return correios_pre_postagem
+
+    def _pre_postagem_batch_record(self, index: int, correios_pre_postagem: dict, result_list: List[dict]) -> None:
+        result_list[index]["codigo_objeto"] = correios_pre_postagem.get(
+            "codigoObjeto"
+        )
+
+        # The CWS call is the one step a rerun cannot repeat safely, so it is
+        # on disk before anything else happens; later steps batch their fsync
+        self.job_journal.record(
+            result_list[index]["order_number"],
+            "pre_postagem",
+            sync=True,
+            pre_postagem=correios_pre_postagem,
+            codigo_objeto=result_list[index]["codigo_objeto"]
+        )
+
+    def _pre_postagem_batch_json_data(self, order_list: List[WixOrder], result_list: List[dict], state_list: List[dict]) -> List[dict]:
+        json_data_list = []
+
+        for result, order, state in zip(result_list, order_list, state_list):
+            if not order:
+                result["error"] = "order not found"
+
+                json_data_list.append(None)
+
+                continue
+
+            if "pre_postagem" in state["step_list"]:
+                json_data_list.append(None)
+
+                continue
+
+            skip_reason = self._wix_order_envio_skip_reason(order)
 
-        endereco = self.cws_handler.cep_endereco(address.get("zipCode"))
+            if skip_reason:
+                result["error"] = skip_reason
+
+                json_data_list.append(None)
+
+                continue
+
+            try:
+                json_data_list.append(
+                    self._correios_pre_postagem_json_data(order)
+                )
+
+            except Exception as error:
+                result["error"] = f"payload: {error!r}"
+
+                json_data_list.append(None)
+
+        return json_data_list
+
+    def _pre_postagem_batch_insert(self, correios_pre_postagem_dict: Dict[int, dict], result_list: List[dict]) -> List[int]:
+        # Upserts keyed on codigoObjeto, so documents a failed or interrupted
+        # batch already stored count as done instead of failing again
+        try:
+            pre_postagem_id_list = self.mongodb_handler.collection_upsert_many(
+                "ecommerce", "pre_postagem", "codigoObjeto", list(
+                    correios_pre_postagem_dict.values()
+                )
+            )
+
+        except Exception as error:
+            for index in correios_pre_postagem_dict:
+                result_list[index]["error"] = f"mongodb: {error!r}"
+
+            return []
+
+        inserted_index_list = []
+
+        for index, pre_postagem_id in zip(correios_pre_postagem_dict, pre_postagem_id_list):
+            if pre_postagem_id is None:
+                result_list[index]["error"] = "mongodb: not stored"
+
+                continue
+
+            # The ObjectId is kept as text, as the journal replays it
+            pre_postagem_id = str(pre_postagem_id)
+
+            result_list[index]["pre_postagem_id"] = pre_postagem_id
+
+            self.job_journal.record(
+                result_list[index]["order_number"], "mongodb", pre_postagem_id=pre_postagem_id
+            )
+
+            inserted_index_list.append(index)
+
+        self.job_journal.sync()
+
+        return inserted_index_list
+
+    def _pre_postagem_rotulo_download(self, codigo_objeto_list: List[str]) -> str:
+        if len(codigo_objeto_list) > 0:
+            pdf = self.cws_handler.pre_postagem_rotulo(codigo_objeto_list)
+
+            pdf_filename = pdf.get("nome", None)
+            pdf_content = pdf.get("dados", None)
+
+            if pdf_filename and pdf_content:
+                pdf_path = os.path.join(
+                    "downloads",
+                    pdf_filename
+                )
+
+                with open(pdf_path, "wb") as pdf_file:
+                    pdf_file.write(base64.b64decode(pdf_content))
+
+                return pdf_path
+
+        return ""
+
+    def _batch_error(self, step: str, error: Exception) -> str:
+        cause = error
+
+        # Clients wrap errors in RequestException, look through the chain
+        while cause:
+            if isinstance(cause, CircuitBreakerOpenError):
+                return f"deferred: {cause}"
+
+            cause = cause.__cause__
+
+        return f"{step}: {error!r}"
+
+    def _correios_enderecador_encomendas_grupos(self, order_list: List[WixOrder], cep_endereco_dict: Dict[str, dict]) -> List[dict]:
+        remetente = cws_pre_postagem_template.remetente_enderecador()
+
+        group_size = 4
+        destinatario_list = []
+        grupo_list = []
+
+        for index, order in enumerate(order_list):
+            if order.shipping_info.shipment_details:
+                cpf = order.billing_info.vat_id
+
+                if len(cpf) == 0:
+                    cpf_cnpj = "34990164865"
+                else:
+                    cpf_cnpj = cpf
+
+                address = order.shipping_info.address
+
+                endereco = cep_endereco_dict.get(address.zip_code) or {}
+
+                cep = f"{endereco.get('cep', '')[:-3]}-{endereco.get('cep', '')[-3:]}"
+
+                peso_total = f"{order.totals.weight:g}".replace(".", ",")
+
+                destinatario = {
+                    "id": order.number,
+                    "nome": f"{address.first_name.strip()} {address.last_name.strip()}",
+                    "cpf_cnpj": f"{cpf_cnpj}",
+                    "logradouro": f"{address.street_name}",
+                    "numero": f"{address.street_number}",
+                    "complemento": f"{address.address_line_2}",
+                    "bairro": f"{endereco.get('bairro', '')}",
+                    "cidade": f"{endereco.get('localidade', '')}",
+                    "estado": f"{endereco.get('uf', '')}",
+                    "cep": cep,
+                    "itens_declaracao_conteudo": self._wix_order_itens_declaracao_conteudo(order),
+                    "peso_total": f"{peso_total}"
+                }
+
+                destinatario_list.append(destinatario)
+
+            if len(order_list) == index + 1 or len(destinatario_list) == group_size:
+                remetente_destinatario_list_dict = {
+                    "remetente": remetente,
+                    "destinatario": destinatario_list
+                }
+
+                grupo_list.append(remetente_destinatario_list_dict)
+
+                destinatario_list = []
+
+        return grupo_list
+
+    def _correios_pre_postagem_json_data(self, order: WixOrder) -> dict:
+        codigo_servico = self._wix_order_codigo_servico(order)
+
+        # An empty code would only be rejected by CWS, after a round trip
+        if not codigo_servico:
+            raise ValueError(
+                f"{order.number}: no codigoServico for {order.shipping_info.delivery_option!r}"
+            )
+
+        codigo_servico_adicional = self._wix_order_codigo_servico_adicional(order)
+
+        if not codigo_servico_adicional:
+            raise ValueError(
+                f"{order.number}: no valor declarado codigoServicoAdicional for {codigo_servico}"
+            )
+
+        return cws_pre_postagem_template.payload({
+            "destinatario": self._wix_order_destinatario(order),
+            "codigoServico": codigo_servico,
+            "codigoServicoAdicional": codigo_servico_adicional,
+            "valorDeclarado": self._wix_order_valor_declarado(order),
+            "itensDeclaracaoConteudo": self._wix_order_itens_declaracao_conteudo(order),
+            "pesoInformado": self._wix_order_peso_informado(order),
+            "observacao": f"number:{order.number}"
+        })
+
+    def _wix_order_destinatario(self, order: WixOrder) -> dict:
+        address = order.shipping_info.address
+
+        endereco = self.cws_handler.cep_endereco(address.zip_code)
 
         pattern = r"[^0-9]"
-        phone = re.sub(pattern, "", address.get("phone", ""))
+        phone = re.sub(pattern, "", address.phone)
         pattern = r"^(?:55)"
         phone = re.sub(pattern, "", phone)
 
         destinatario = {
-            "nome": f"{address.get('fullName', {}).get('firstName', '')} {address.get('fullName', {}).get('lastName', '')}",
+            "nome": f"{address.first_name} {address.last_name}",
             "dddTelefone": "",
             "telefone": "",
             "dddCelular": f"{phone[:2]}",
             "celular": f"{phone[2:]}",
-            "email": f"{address.get('email', '')}",
-            "cpfCnpj": f"{address.get('vatId', {}).get('number', '')}",
+            "email": f"{address.email}",
+            "cpfCnpj": f"{address.vat_id}",
             "documentoEstrangeiro": "",
-            "obs": f"number:{number}",
+            "obs": f"number:{order.number}",
             "endereco": {
                 "cep": f"{endereco.get('cep', '')}",
                 "logradouro": f"{endereco.get('logradouro', '')}",
-                "numero": f"{address.get('street', {}).get('number', '')}",
-                "complemento": f"{address.get('addressLine2', '')}",
+                "numero": f"{address.street_number}",
+                "complemento": f"{address.address_line_2}",
                 "bairro": f"{endereco.get('bairro', '')}",
                 "cidade": f"{endereco.get('localidade', '')}",
                 "uf": f"{endereco.get('uf', '')}"
@@ -565,52 +1200,67 @@ class Ecommerce:
 
         return destinatario
 
-    def _wix_order_codigo_servico(self, order: dict) -> str:
-        shipping_info = order.get("shippingInfo", "")
-        delivery_option = shipping_info.get("deliveryOption", "")
-
-        if delivery_option == "PAC":
-            # PAC CONTRATO AG
-            return "03298"
-        elif delivery_option == "SEDEX":
-            # SEDEX CONTRATO AG
-            return "03220"
-
-    def _wix_order_codigo_servico_adicional(self, order: dict) -> str:
-        shipping_info = order.get("shippingInfo", "")
-        delivery_option = shipping_info.get("deliveryOption", "")
-
-        if delivery_option == "PAC":
-            # PAC CONTRATO AG
-            return "064"
-        elif delivery_option == "SEDEX":
-            # SEDEX CONTRATO AG
-            return "019"
-
-    def _wix_order_valor_declarado(self, order: dict) -> float:
-        totals = order.get("totals", {})
-        subtotal = totals.get("subtotal", "")
-
-        return float(subtotal)
-
-    def _wix_order_itens_declaracao_conteudo(self, order: dict) -> list:
-        line_items = order.get("lineItems")
-        itens_declaracao_conteudo = []
-
-        for item in line_items:
-            item_declaracao_conteudo = {
-                "conteudo": item.get("name", ""),
-                "quantidade": int(item.get("quantity", "")),
-                "valor": float(item.get("priceData", {}).get("totalPrice", ""))
+    def _wix_order_fulfillment(self, order: WixOrder, tracking_number: str) -> OrderFulfillment:
+        fulfillment_line_items_list = [
+            {
+                "index": item.index,
+                "quantity": item.quantity
             }
+            for item in order.line_items
+        ]
+
+        order_fulfillment = OrderFulfillment(
+            tracking_info_shipping_provider="Correios",
+            tracking_info_tracking_number=tracking_number,
+            tracking_info_tracking_link=f"https://www.websro.com.br/rastreamento-correios.php?P_COD_UNI={tracking_number}",
+            line_items=fulfillment_line_items_list
+        )
 
-            itens_declaracao_conteudo.append(item_declaracao_conteudo)
+        return order_fulfillment
 
-        return itens_declaracao_conteudo
+    def _wix_order_envio_skip_reason(self, order: WixOrder) -> str:
+        if not order.shipping_info.shipment_details:
+            return "no shipment details"
 
-    def _wix_order_peso_informado(self, order: dict) -> str:
-        totals = order.get("totals", {})
+        if order.shipping_info.delivery_option not in ServicoDescricao.__members__:
+            return f"unknown delivery option: {order.shipping_info.delivery_option!r}"
+
+        return ""
+
+    def _wix_order_zip_code(self, order: WixOrder) -> str:
+        return order.shipping_info.address.zip_code
+
+    def _wix_order_codigo_servico(self, order: WixOrder) -> str:
+        delivery_option = order.shipping_info.delivery_option
+
+        if delivery_option not in ServicoDescricao.__members__:
+            return ""
+
+        return self.cws_handler.codigo_servico(
+            ServicoDescricao[delivery_option].value
+        )
+
+    def _wix_order_codigo_servico_adicional(self, order: WixOrder) -> str:
+        codigo_servico = self._wix_order_codigo_servico(order)
+
+        return self.cws_handler.codigo_servico_adicional_valor_declarado(
+            codigo_servico
+        )
+
+    def _wix_order_valor_declarado(self, order: WixOrder) -> float:
+        return order.totals.subtotal
+
+    def _wix_order_itens_declaracao_conteudo(self, order: WixOrder) -> list:
+        return [
+            {
+                "conteudo": item.name,
+                "quantidade": item.quantity,
+                "valor": item.total_price
+            }
+            for item in order.line_items
+        ]
 
-        total_weight_grams = float(totals.get("weight", 0)) * 1000
+    def _wix_order_peso_informado(self, order: WixOrder) -> str:
+        total_weight_grams = order.totals.weight * 1000
 
         return str(int(total_weight_grams))
@@ -0,0 +1,105 @@
+import time
+
+import requests
+
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from app_config import AppConfig
+from circuit_breaker import CircuitBreaker, CircuitBreakerRegistry, circuit_breaker_registry
+from rate_limiter import RateLimiter, rate_limiter
+
+
+class HttpSession(requests.Session):
+    app_config: AppConfig
+    section: str
+    circuit_breaker_registry: CircuitBreakerRegistry
+    rate_limiter: RateLimiter
+    max_throttled_retries: int
+
+    def __init__(self, app_config: AppConfig, section: str):
+        super().__init__()
+
+        self.app_config = app_config
+        self.section = section
+        self.circuit_breaker_registry = circuit_breaker_registry
+        self.rate_limiter = rate_limiter
+        self.max_throttled_retries = int(
+            self.app_config.get(section, "max_retries", 3)
+        )
+
+        # 429 is handled in request() so the rate limiter can slow down
+        retry = Retry(
+            total=int(self.app_config.get(section, "max_retries", 3)),
+            backoff_factor=float(
+                self.app_config.get(section, "retry_backoff_factor", 0.5)
+            ),
+            status_forcelist=(500, 502, 503, 504),
+            respect_retry_after_header=True,
+            raise_on_status=False
+        )
+
+        adapter = HTTPAdapter(
+            pool_connections=int(
+                self.app_config.get(section, "pool_connections", 4)
+            ),
+            pool_maxsize=int(self.app_config.get(section, "pool_maxsize", 16)),
+            max_retries=retry
+        )
+
+        self.mount("http://", adapter)
+        self.mount("https://", adapter)
+
+        self.headers["Connection"] = "keep-alive"
+
+    def _send_request(self, circuit_breaker: CircuitBreaker, method, url, *args, **kwargs) -> requests.Response:
+        if not circuit_breaker:
+            return super().request(method, url, *args, **kwargs)
+
+        circuit_breaker.before_call()
+
+        started_at = time.monotonic()
+
+        try:
+            response = super().request(method, url, *args, **kwargs)
+
+        except BaseException:
+            # Interrupted calls count too, or a half-open probe slot is lost
+            circuit_breaker.after_call(False, time.monotonic() - started_at)
+
+            raise
+
+        circuit_breaker.after_call(
+            response.status_code < 500, time.monotonic() - started_at
+        )
+
+        return response
+
+    def request(self, method, url, *args, **kwargs) -> requests.Response:
+        bucket = self.rate_limiter.bucket(url, self.app_config, self.section)
+        circuit_breaker = self.circuit_breaker_registry.circuit_breaker(
+            url, self.app_config, self.section
+        )
+
+        if not bucket:
+            return self._send_request(circuit_breaker, method, url, *args, **kwargs)
+
+        for attempt in range(self.max_throttled_retries + 1):
+            bucket.acquire()
+
+            response = self._send_request(
+                circuit_breaker, method, url, *args, **kwargs
+            )
+
+            if response.status_code != 429:
+                bucket.on_success()
+
+                return response
+
+            bucket.on_throttled(
+                self.rate_limiter.retry_after(
+                    response.headers.get("Retry-After")
+                )
+            )
+
+        return response
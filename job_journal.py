@@ -0,0 +1,157 @@
+import json
+import os
+import threading
+import time
+
+from typing import Dict, Optional, TextIO
+
+
+class JobJournal:
+    path: str
+    fsync_batch: int
+    compact_size: int
+    state_by_key: Dict[str, dict]
+
+    def __init__(self, path: str, fsync_batch: int = 64, compact_size: int = 8388608):
+        self.path = path
+        self.fsync_batch = fsync_batch
+        self.compact_size = compact_size
+        self.state_by_key = {}
+
+        self._file: Optional[TextIO] = None
+        self._unsynced = 0
+        self._lock = threading.Lock()
+
+        self._load()
+
+        if os.path.exists(self.path) and os.path.getsize(self.path) > self.compact_size:
+            self.compact()
+
+    def _apply(self, record: dict) -> None:
+        key = record.get("key")
+
+        # Cancelling a job starts it over on the next run
+        if record.get("step") == "cancela":
+            self.state_by_key.pop(key, None)
+
+            return
+
+        # A compacted record carries the whole state of its key
+        if record.get("step") == "compact":
+            self.state_by_key[key] = record.get("data", {})
+
+            return
+
+        state = self.state_by_key.setdefault(key, {"step_list": []})
+        state["step_list"].append(record.get("step"))
+        state.update(record.get("data", {}))
+
+        # Once stored in Mongo the CWS payload is never replayed again
+        if "mongodb" in state["step_list"]:
+            state.pop("pre_postagem", None)
+
+    def _load(self) -> None:
+        if not os.path.exists(self.path):
+            return
+
+        with open(self.path, "r", encoding="utf-8") as file:
+            for line in file:
+                try:
+                    record = json.loads(line)
+
+                except json.JSONDecodeError:
+                    # A torn last line from a crash is dropped
+                    continue
+
+                self._apply(record)
+
+    def _open(self) -> TextIO:
+        if self._file is None:
+            directory = os.path.dirname(self.path)
+
+            if directory and not os.path.exists(directory):
+                os.makedirs(directory)
+
+            self._file = open(self.path, "a", encoding="utf-8")
+
+            # New records must not be glued onto a torn last line
+            if self._file.tell() > 0:
+                with open(self.path, "rb") as file:
+                    file.seek(-1, os.SEEK_END)
+
+                    if file.read(1) != b"\n":
+                        self._file.write("\n")
+
+        return self._file
+
+    def _sync(self) -> None:
+        if self._file is not None and self._unsynced > 0:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+            self._unsynced = 0
+
+    def record(self, key: str, step: str, sync: bool = False, **data) -> None:
+        record = {
+            "key": key,
+            "step": step,
+            "timestamp": time.time(),
+            "data": data
+        }
+
+        with self._lock:
+            file = self._open()
+            file.write(json.dumps(record, ensure_ascii=False, default=str))
+            file.write("\n")
+
+            self._unsynced += 1
+            self._apply(json.loads(json.dumps(record, default=str)))
+
+            if sync or self._unsynced >= self.fsync_batch:
+                self._sync()
+
+    def compact(self) -> None:
+        with self._lock:
+            self._sync()
+
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+            temp_path = f"{self.path}.tmp"
+
+            with open(temp_path, "w", encoding="utf-8") as file:
+                for key, state in self.state_by_key.items():
+                    file.write(json.dumps(
+                        {"key": key, "step": "compact", "timestamp": time.time(), "data": state},
+                        ensure_ascii=False,
+                        default=str
+                    ))
+                    file.write("\n")
+
+                file.flush()
+                os.fsync(file.fileno())
+
+            os.replace(temp_path, self.path)
+
+    def sync(self) -> None:
+        with self._lock:
+            self._sync()
+
+    def state(self, key: str) -> dict:
+        with self._lock:
+            state = self.state_by_key.get(key, {"step_list": []})
+
+            return {**state, "step_list": list(state["step_list"])}
+
+    def done(self, key: str, step: str) -> bool:
+        with self._lock:
+            return step in self.state_by_key.get(key, {}).get("step_list", [])
+
+    def close(self) -> None:
+        with self._lock:
+            self._sync()
+
+            if self._file is not None:
+                self._file.close()
+                self._file = None
@@ -0,0 +1,211 @@
+from typing import List, Optional, Tuple
+
+from concurrent.futures import ProcessPoolExecutor
+
+import io
+import os
+
+from PIL import Image, ImageDraw, ImageFont
+
+
+LABEL_SHEET_COLUMNS = 2
+LABEL_SHEET_ROWS = 2
+
+
+class LabelLayout:
+    draw: ImageDraw.ImageDraw
+    font: ImageFont.ImageFont
+    font_bold: ImageFont.ImageFont
+    x: int
+    y: int
+    width: int
+    line_height: int
+
+    def __init__(self, draw: ImageDraw.ImageDraw, font: ImageFont.ImageFont, font_bold: ImageFont.ImageFont, box: Tuple[int, int, int, int], line_height: int):
+        self.draw = draw
+        self.font = font
+        self.font_bold = font_bold
+        self.x, self.y, right, _ = box
+        self.width = right - self.x
+        self.line_height = line_height
+
+    def _fit(self, text: str, font: ImageFont.ImageFont, width: int) -> str:
+        if self.draw.textlength(text, font=font) <= width:
+            return text
+
+        while text and self.draw.textlength(f"{text}...", font=font) > width:
+            text = text[:-1]
+
+        return f"{text}..."
+
+    def text(self, text: str, bold: bool = False) -> None:
+        font = self.font_bold if bold else self.font
+
+        self.draw.text(
+            (self.x, self.y), self._fit(text, font, self.width), fill=(0, 0, 0), font=font
+        )
+
+        self.y += self.line_height
+
+    def row(self, column_list: List[Tuple[str, float]], bold: bool = False) -> None:
+        font = self.font_bold if bold else self.font
+        x = self.x
+
+        # Each column gets its share of the line width
+        for text, share in column_list:
+            width = int(self.width * share)
+
+            self.draw.text(
+                (x, self.y), self._fit(text, font, width - 8), fill=(0, 0, 0), font=font
+            )
+
+            x += width
+
+        self.y += self.line_height
+
+    def rule(self) -> None:
+        middle = self.y + self.line_height // 4
+
+        self.draw.line(
+            (self.x, middle, self.x + self.width, middle), fill=(0, 0, 0), width=1
+        )
+
+        self.y += self.line_height // 2
+
+    def space(self) -> None:
+        self.y += self.line_height // 2
+
+
+def _label_font(font_path: Optional[str], size: int) -> ImageFont.ImageFont:
+    if font_path:
+        try:
+            return ImageFont.truetype(font=font_path, size=size, encoding="utf-8")
+
+        except OSError:
+            pass
+
+    return ImageFont.load_default(size=size)
+
+
+def _label_draw(layout: LabelLayout, remetente: dict, destinatario: dict) -> None:
+    layout.text("DESTINATÁRIO", bold=True)
+    layout.text(destinatario.get("nome", ""), bold=True)
+    layout.text(
+        f"{destinatario.get('logradouro', '')}, {destinatario.get('numero', '')} {destinatario.get('complemento', '')}".strip()
+    )
+    layout.text(destinatario.get("bairro", ""))
+    layout.text(
+        f"{destinatario.get('cidade', '')} / {destinatario.get('estado', '')}"
+    )
+    layout.text(f"CEP {destinatario.get('cep', '')}", bold=True)
+    layout.text(f"Pedido {destinatario.get('id', '')}")
+
+    layout.rule()
+
+    layout.text("REMETENTE", bold=True)
+    layout.text(remetente.get("nome", ""))
+    layout.text(
+        f"{remetente.get('logradouro', '')}, {remetente.get('numero', '')} {remetente.get('complemento', '') or ''}".strip()
+    )
+    layout.text(
+        f"{remetente.get('bairro', '')} - {remetente.get('cidade', '')} / {remetente.get('estado', '')}"
+    )
+    layout.text(f"CEP {remetente.get('cep', '')}")
+
+    layout.rule()
+
+    layout.text("DECLARAÇÃO DE CONTEÚDO", bold=True)
+    layout.row([("Conteúdo", 0.6), ("Qtd.", 0.15), ("Valor", 0.25)], bold=True)
+
+    for item in destinatario.get("itens_declaracao_conteudo", []):
+        layout.row([
+            (str(item.get("conteudo", "")), 0.6),
+            (str(item.get("quantidade", "")), 0.15),
+            (f"{float(item.get('valor', 0)):.2f}".replace(".", ","), 0.25)
+        ])
+
+    layout.space()
+    layout.text(f"Peso total (kg): {destinatario.get('peso_total', '')}", bold=True)
+
+
+def label_sheet_render(remetente_destinatario_list_dict: dict, font_path: Optional[str], dpi: int) -> bytes:
+    # A4 page, one label per quadrant
+    width = int(8.27 * dpi)
+    height = int(11.69 * dpi)
+    margin = int(0.2 * dpi)
+
+    cell_width = width // LABEL_SHEET_COLUMNS
+    cell_height = height // LABEL_SHEET_ROWS
+
+    font_size = max(int(dpi / 10), 8)
+
+    font = _label_font(font_path, font_size)
+    font_bold = _label_font(font_path, int(font_size * 1.15))
+
+    image = Image.new("RGB", (width, height), (255, 255, 255))
+    draw = ImageDraw.Draw(image)
+
+    remetente = remetente_destinatario_list_dict.get("remetente", {})
+    destinatario_list = remetente_destinatario_list_dict.get("destinatario", [])
+
+    for position, destinatario in enumerate(destinatario_list[:LABEL_SHEET_COLUMNS * LABEL_SHEET_ROWS]):
+        left = (position % LABEL_SHEET_COLUMNS) * cell_width
+        top = (position // LABEL_SHEET_COLUMNS) * cell_height
+
+        draw.rectangle(
+            (left + margin // 2, top + margin // 2, left + cell_width - margin // 2, top + cell_height - margin // 2),
+            outline=(0, 0, 0),
+            width=2
+        )
+
+        layout = LabelLayout(
+            draw,
+            font,
+            font_bold,
+            (left + margin, top + margin, left + cell_width - margin, top + cell_height - margin),
+            int(font_size * 1.5)
+        )
+
+        _label_draw(layout, remetente, destinatario)
+
+    buffer = io.BytesIO()
+    image.save(buffer, "PNG")
+
+    return buffer.getvalue()
+
+
+class LabelRenderer:
+    font_path: Optional[str]
+    dpi: int
+    max_workers: int
+
+    def __init__(self, font_path: Optional[str] = None, dpi: int = 150, max_workers: int = 4):
+        self.font_path = font_path
+        self.dpi = dpi
+        self.max_workers = max_workers
+
+    def render(self, grupo_list: List[dict], pdf_path: str) -> str:
+        if len(grupo_list) == 0:
+            return ""
+
+        # Pillow drawing holds the GIL, so sheets are drawn in worker processes
+        with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+            sheet_list = list(executor.map(
+                label_sheet_render,
+                grupo_list,
+                [self.font_path] * len(grupo_list),
+                [self.dpi] * len(grupo_list)
+            ))
+
+        image_list = [Image.open(io.BytesIO(sheet)) for sheet in sheet_list]
+
+        directory = os.path.dirname(pdf_path)
+
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+
+        image_list[0].save(
+            pdf_path, "PDF", resolution=self.dpi, save_all=True, append_images=image_list[1:]
+        )
+
+        return pdf_path
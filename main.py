@@ -45,3 +45,5 @@ if __name__ == "__main__":
         wsa_handler,
         wix_order_handler
     )
+
+    cws_handler.close()
@@ -1,10 +1,13 @@
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Iterator, List, Optional
 
+from pymongo import IndexModel, UpdateOne
+from pymongo.errors import BulkWriteError
 from pymongo.mongo_client import MongoClient
 from pymongo.server_api import ServerApi
 
 from app_config import AppConfig
 from app_logger import AppLogger
+from mongodb_data import CollectionIndex
 
 
 class MongoDBClient:
@@ -35,10 +38,28 @@ class MongoDBClient:
     def collection_create(self, database_name: str, collection_name: str) -> None:
         database = self.client[database_name]
 
+        if collection_name in database.list_collection_names():
+            return
+
         database.create_collection(
             collection_name
         )
 
+    def collection_index_create(self, database_name: str, collection_name: str, index_list: List[CollectionIndex]) -> List[str]:
+        database = self.client[database_name]
+        collection = database[collection_name]
+
+        # Default index names keep a spec that already exists a no-op
+        return collection.create_indexes([
+            IndexModel(list(index.keys), unique=index.unique) for index in index_list
+        ])
+
+    def collection_index_stats(self, database_name: str, collection_name: str) -> List[dict]:
+        database = self.client[database_name]
+        collection = database[collection_name]
+
+        return list(collection.aggregate([{"$indexStats": {}}]))
+
     def collection_drop(self, database_name: str, collection_name: str) -> None:
         database = self.client[database_name]
         collection = database[collection_name]
@@ -56,12 +77,30 @@ class MongoDBClient:
             raise ValueError from error
 
     def collection_list(self, database_name: str, collection_name: str) -> list:
+        return list(self.collection_iter(database_name, collection_name))
+
+    def collection_iter(self, database_name: str, collection_name: str, filter: Optional[dict] = None, projection: Optional[dict] = None, sort: Optional[list] = None, batch_size: int = 1000, resume_after_id: Any = None) -> Iterator[dict]:
         database = self.client[database_name]
         collection = database[collection_name]
 
-        all_documents = collection.find({})
+        filter = dict(filter or {})
 
-        return list(all_documents)
+        # The last _id handed out resumes the scan, which needs the _id order
+        if resume_after_id is not None:
+            filter = {"$and": [filter, {"_id": {"$gt": resume_after_id}}]}
+
+        if sort is None:
+            sort = [("_id", 1)]
+
+        with collection.find(filter, projection, sort=sort, batch_size=batch_size) as cursor:
+            yield from cursor
+
+    def collection_aggregate(self, database_name: str, collection_name: str, pipeline: List[dict], batch_size: int = 1000) -> Iterator[dict]:
+        database = self.client[database_name]
+        collection = database[collection_name]
+
+        with collection.aggregate(pipeline, allowDiskUse=True, batchSize=batch_size) as cursor:
+            yield from cursor
 
     def collection_insert(self, database_name: str, collection_name: str, data: Dict[str, Any]):
         try:
@@ -73,20 +112,118 @@ class MongoDBClient:
         except Exception as error:
             raise ValueError from error
 
-    def wix_order_replicate(self, database_name: str, collection_name: str, data_list: list) -> None:
+    def collection_upsert_many(self, database_name: str, collection_name: str, key: str, data_list: List[Dict[str, Any]]) -> list:
+        database = self.client[database_name]
+        collection = database[collection_name]
+
+        # Inserts only documents whose key is not stored yet, so a repeated
+        # batch is a no-op; returns the stored _id per document, None if it failed
+        index_list = [
+            index for index, data in enumerate(data_list) if data.get(key) is not None
+        ]
+
+        request_list = [
+            UpdateOne(
+                {key: data_list[index][key]},
+                {"$setOnInsert": {field: value for field, value in data_list[index].items() if field != "_id"}},
+                upsert=True
+            )
+            for index in index_list
+        ]
+
+        upserted_id_by_index = {}
+        failed_index_set = set(range(len(data_list))) - set(index_list)
+
+        if len(request_list) == 0:
+            return [None] * len(data_list)
+
+        try:
+            result = collection.bulk_write(request_list, ordered=False)
+
+            upserted_id_by_index = {
+                index_list[position]: _id for position, _id in result.upserted_ids.items()
+            }
+
+        except BulkWriteError as error:
+            details = error.details
+
+            upserted_id_by_index = {
+                index_list[upserted["index"]]: upserted["_id"] for upserted in details.get("upserted", [])
+            }
+
+            # A duplicate key means a concurrent upsert stored it first
+            failed_index_set |= {
+                index_list[write_error["index"]] for write_error in details.get("writeErrors", [])
+                if write_error.get("code") != 11000
+            }
+
+        except Exception as error:
+            raise ValueError from error
+
+        existing_id_by_key = {
+            document[key]: document["_id"]
+            for document in collection.find(
+                {key: {"$in": [
+                    data_list[index][key] for index in index_list
+                    if index not in upserted_id_by_index and index not in failed_index_set
+                ]}},
+                {key: 1}
+            )
+        }
+
+        return [
+            None if index in failed_index_set else upserted_id_by_index.get(
+                index, existing_id_by_key.get(data.get(key))
+            )
+            for index, data in enumerate(data_list)
+        ]
+
+    def wix_order_replicate(self, database_name: str, collection_name: str, data_list: list, batch_size: int = 1000) -> dict:
         database = self.client[database_name]
         collection = database[collection_name]
 
-        for obj in data_list:
-            # Check if the document with the same ID exists in MongoDB
-            existing_document = collection.find_one({"id": obj["id"]})
-
-            if existing_document:
-                # Compare lastUpdated dates
-                if obj["lastUpdated"] > existing_document["lastUpdated"]:
-                    # Update the document in MongoDB
-                    collection.update_one(
-                        {"_id": existing_document["_id"]}, {"$set": obj})
-            else:
-                # Insert as a new document in MongoDB
-                collection.insert_one(obj)
+        # An upsert that misses the lastUpdated filter on an existing id hits
+        # this index, which is how stale orders are skipped server-side
+        collection.create_index("id", unique=True)
+
+        summary = {
+            "matched": 0,
+            "upserted": 0,
+            "modified": 0,
+            "skipped": 0
+        }
+
+        for start in range(0, len(data_list), batch_size):
+            request_list = [
+                UpdateOne(
+                    {"id": obj["id"], "lastUpdated": {"$lt": obj["lastUpdated"]}},
+                    {"$set": {key: value for key, value in obj.items() if key != "_id"}},
+                    upsert=True
+                )
+                for obj in data_list[start:start + batch_size]
+            ]
+
+            try:
+                result = collection.bulk_write(request_list, ordered=False)
+
+                summary["matched"] += result.matched_count
+                summary["upserted"] += result.upserted_count
+                summary["modified"] += result.modified_count
+
+            except BulkWriteError as error:
+                details = error.details
+
+                write_error_list = [
+                    write_error for write_error in details.get("writeErrors", [])
+                    if write_error.get("code") != 11000
+                ]
+
+                if len(write_error_list) > 0:
+                    raise ValueError(write_error_list) from error
+
+                summary["matched"] += details.get("nMatched", 0)
+                summary["upserted"] += details.get("nUpserted", 0)
+                summary["modified"] += details.get("nModified", 0)
+                summary["skipped"] += len(details.get("writeErrors", []))
+
+        return summary
@@ -0,0 +1,21 @@
+from dataclasses import dataclass
+from typing import List, Tuple
+
+
+@dataclass(frozen=True)
+class CollectionIndex:
+    keys: Tuple[Tuple[str, int], ...]
+    unique: bool = False
+
+
+WIX_ORDER_INDEX_LIST: List[CollectionIndex] = [
+    CollectionIndex(keys=(("id", 1),), unique=True),
+    CollectionIndex(keys=(("number", 1),)),
+    CollectionIndex(keys=(("lastUpdated", 1),)),
+    CollectionIndex(keys=(("fulfillments.trackingInfo.trackingNumber", 1),))
+]
+
+PRE_POSTAGEM_INDEX_LIST: List[CollectionIndex] = [
+    CollectionIndex(keys=(("codigoObjeto", 1),), unique=True),
+    CollectionIndex(keys=(("observacao", 1),))
+]
@@ -1,7 +1,12 @@
-from typing import Any, Dict
+from typing import Any, Dict, Iterator, List, Optional
+
+import csv
+
+from bson import json_util
 
 from app_config import AppConfig
 from app_logger import AppLogger
+from mongodb_data import CollectionIndex
 from mongodb_client import MongoDBClient
 
 
@@ -14,13 +19,25 @@ class MongoDBHandler:
         self.app_config = app_config
         self.mongodb_client = MongoDBClient(app_config, app_logger)
 
-    def collection_create(self, database_name: str, collection_name: str):
+    def collection_create(self, database_name: str, collection_name: str, index_list: Optional[List[CollectionIndex]] = None):
         self.mongodb_client.connect()
 
         self.mongodb_client.collection_create(
             database_name, collection_name
         )
 
+        if index_list:
+            self.mongodb_client.collection_index_create(
+                database_name, collection_name, index_list
+            )
+
+    def collection_index_stats(self, database_name: str, collection_name: str) -> List[dict]:
+        self.mongodb_client.connect()
+
+        return self.mongodb_client.collection_index_stats(
+            database_name, collection_name
+        )
+
     def collection_drop(self, database_name: str, collection_name: str):
         self.mongodb_client.connect()
 
@@ -42,6 +59,78 @@ class MongoDBHandler:
             database_name, collection_name
         )
 
+    def collection_iter(self, database_name: str, collection_name: str, filter: Optional[dict] = None, projection: Optional[dict] = None, sort: Optional[list] = None, batch_size: int = 1000, resume_after_id: Any = None) -> Iterator[dict]:
+        self.mongodb_client.connect()
+
+        return self.mongodb_client.collection_iter(
+            database_name, collection_name, filter=filter, projection=projection, sort=sort, batch_size=batch_size, resume_after_id=resume_after_id
+        )
+
+    def collection_aggregate(self, database_name: str, collection_name: str, pipeline: List[dict], batch_size: int = 1000) -> Iterator[dict]:
+        self.mongodb_client.connect()
+
+        return self.mongodb_client.collection_aggregate(
+            database_name, collection_name, pipeline, batch_size=batch_size
+        )
+
+    def collection_export_jsonl(self, database_name: str, collection_name: str, path: str, filter: Optional[dict] = None, projection: Optional[dict] = None, resume_after_id: Any = None) -> dict:
+        count = 0
+        last_id = resume_after_id
+
+        # A resumed export appends to the file the interrupted one left behind
+        with open(path, "a" if resume_after_id is not None else "w", encoding="utf-8") as file:
+            for document in self.collection_iter(database_name, collection_name, filter=filter, projection=projection, resume_after_id=resume_after_id):
+                file.write(json_util.dumps(document, ensure_ascii=False))
+                file.write("\n")
+
+                count += 1
+                last_id = document.get("_id")
+
+        return {
+            "count": count,
+            "last_id": last_id
+        }
+
+    def collection_export_csv(self, database_name: str, collection_name: str, path: str, field_list: List[str], filter: Optional[dict] = None, resume_after_id: Any = None) -> dict:
+        count = 0
+        last_id = resume_after_id
+
+        projection = {field: 1 for field in field_list}
+
+        with open(path, "a" if resume_after_id is not None else "w", encoding="utf-8", newline="") as file:
+            writer = csv.writer(file)
+
+            if resume_after_id is None:
+                writer.writerow(field_list)
+
+            for document in self.collection_iter(database_name, collection_name, filter=filter, projection=projection, resume_after_id=resume_after_id):
+                writer.writerow([
+                    self._csv_value(document, field) for field in field_list
+                ])
+
+                count += 1
+                last_id = document.get("_id")
+
+        return {
+            "count": count,
+            "last_id": last_id
+        }
+
+    @staticmethod
+    def _csv_value(document: dict, field: str) -> Any:
+        value = document
+
+        for key in field.split("."):
+            if not isinstance(value, dict):
+                return ""
+
+            value = value.get(key, "")
+
+        if isinstance(value, (dict, list)):
+            return json_util.dumps(value, ensure_ascii=False)
+
+        return value
+
     def collection_insert(self, database_name: str, collection_name: str, data: Dict[str, Any]):
         self.mongodb_client.connect()
 
@@ -49,9 +138,18 @@ class MongoDBHandler:
             database_name, collection_name, data=data
         )
 
-    def wix_order_replicate(self, database_name: str, collection_name: str, data_list: list):
+    def collection_upsert_many(self, database_name: str, collection_name: str, key: str, data_list: List[Dict[str, Any]]) -> list:
+        self.mongodb_client.connect()
+
+        return self.mongodb_client.collection_upsert_many(
+            database_name, collection_name, key, data_list=data_list
+        )
+
+    def wix_order_replicate(self, database_name: str, collection_name: str, data_list: list) -> dict:
         self.mongodb_client.connect()
 
-        self.mongodb_client.wix_order_replicate(
-            database_name, collection_name, data_list=data_list
+        return self.mongodb_client.wix_order_replicate(
+            database_name, collection_name, data_list=data_list, batch_size=int(
+                self.app_config.get("DEFAULT", "wix_order_replicate_batch_size", 1000)
+            )
         )
@@ -0,0 +1,153 @@
+import queue
+import threading
+import time
+
+from typing import Any, Callable, Iterable, List, Optional
+
+
+_PIPELINE_END = object()
+
+
+class PipelineStage:
+    name: str
+    function: Callable[[Any], None]
+    max_workers: int
+    queue_size: int
+
+    count: int
+    error_count: int
+    busy_seconds: float
+    started_at: Optional[float]
+    finished_at: Optional[float]
+
+    def __init__(self, name: str, function: Callable[[Any], None], max_workers: int = 1, queue_size: int = 32):
+        self.name = name
+        self.function = function
+        self.max_workers = max_workers
+        self.queue_size = queue_size
+
+        self.count = 0
+        self.error_count = 0
+        self.busy_seconds = 0.0
+        self.started_at = None
+        self.finished_at = None
+
+        self._lock = threading.Lock()
+
+    def _record(self, started_at: float, finished_at: float, error: bool) -> None:
+        with self._lock:
+            if self.started_at is None or started_at < self.started_at:
+                self.started_at = started_at
+
+            if self.finished_at is None or finished_at > self.finished_at:
+                self.finished_at = finished_at
+
+            self.count += 1
+            self.busy_seconds += finished_at - started_at
+
+            if error:
+                self.error_count += 1
+
+    def metrics(self) -> dict:
+        with self._lock:
+            elapsed = 0.0
+
+            if self.started_at is not None:
+                elapsed = self.finished_at - self.started_at
+
+            return {
+                "name": self.name,
+                "count": self.count,
+                "error_count": self.error_count,
+                "busy_seconds": self.busy_seconds,
+                "elapsed_seconds": elapsed,
+                "throughput": self.count / elapsed if elapsed > 0 else 0.0
+            }
+
+
+class Pipeline:
+    stage_list: List[PipelineStage]
+    on_error: Callable[[Any, PipelineStage, Exception], None]
+
+    def __init__(self, stage_list: List[PipelineStage], on_error: Callable[[Any, PipelineStage, Exception], None]):
+        self.stage_list = stage_list
+        self.on_error = on_error
+
+    def _worker(self, stage: PipelineStage, input_queue: queue.Queue, output: Callable[[Any], None], done: Callable[[Any], None]) -> None:
+        while True:
+            item = input_queue.get()
+
+            if item is _PIPELINE_END:
+                return
+
+            started_at = time.monotonic()
+
+            try:
+                stage.function(item)
+
+            except Exception as error:
+                stage._record(started_at, time.monotonic(), True)
+
+                # A failed item leaves the pipeline, later stages never see it
+                self.on_error(item, stage, error)
+                done(item)
+
+                continue
+
+            stage._record(started_at, time.monotonic(), False)
+
+            output(item)
+
+    def run(self, source: Iterable[Any]) -> List[Any]:
+        result_list = []
+        result_lock = threading.Lock()
+
+        def done(item: Any) -> None:
+            with result_lock:
+                result_list.append(item)
+
+        # Bounded queues block the upstream stage when a downstream one lags
+        queue_list = [
+            queue.Queue(maxsize=stage.queue_size) for stage in self.stage_list
+        ]
+
+        thread_list_by_stage = []
+
+        for position, stage in enumerate(self.stage_list):
+            if position + 1 < len(self.stage_list):
+                output = queue_list[position + 1].put
+            else:
+                output = done
+
+            thread_list = [
+                threading.Thread(
+                    target=self._worker,
+                    args=(stage, queue_list[position], output, done),
+                    name=f"pipeline-{stage.name}-{index}",
+                    daemon=True
+                )
+                for index in range(stage.max_workers)
+            ]
+
+            for thread in thread_list:
+                thread.start()
+
+            thread_list_by_stage.append(thread_list)
+
+        try:
+            for item in source:
+                queue_list[0].put(item)
+
+        finally:
+            # Each stage is closed once the stage before it has fully drained
+            for position, stage in enumerate(self.stage_list):
+                for _ in range(stage.max_workers):
+                    queue_list[position].put(_PIPELINE_END)
+
+                for thread in thread_list_by_stage[position]:
+                    thread.join()
+
+        return result_list
+
+    def metrics(self) -> List[dict]:
+        return [stage.metrics() for stage in self.stage_list]
@@ -0,0 +1,139 @@
+import asyncio
+import threading
+import time
+
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlparse
+
+from app_config import AppConfig
+
+
+class TokenBucket:
+    max_rate: float
+    min_rate: float
+    rate: float
+    burst: float
+    tokens: float
+
+    def __init__(self, rate: float, burst: float, min_rate: float = 0.5, decrease_factor: float = 0.5, increase_step: float = 0.1):
+        self.max_rate = rate
+        self.min_rate = min(min_rate, rate)
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.decrease_factor = decrease_factor
+        self.increase_step = increase_step
+
+        self._lock = threading.Lock()
+        self._updated_at = time.monotonic()
+        self._paused_until = 0.0
+
+    def _reserve(self) -> float:
+        with self._lock:
+            now = time.monotonic()
+
+            self.tokens = min(
+                self.burst, self.tokens + (now - self._updated_at) * self.rate
+            )
+            self._updated_at = now
+
+            # Tokens may go negative, the caller waits for its own reservation
+            self.tokens -= 1
+
+            wait = max(0.0, -self.tokens / self.rate)
+
+            return max(wait, self._paused_until - now)
+
+    def acquire(self) -> None:
+        wait = self._reserve()
+
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self) -> None:
+        wait = self._reserve()
+
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def on_success(self) -> None:
+        with self._lock:
+            if self.rate < self.max_rate:
+                self.rate = min(self.max_rate, self.rate + self.increase_step)
+
+    def on_throttled(self, retry_after: Optional[float] = None) -> None:
+        with self._lock:
+            self.rate = max(self.min_rate, self.rate * self.decrease_factor)
+            self.tokens = min(self.tokens, 0.0)
+
+            pause = retry_after if retry_after is not None else 1 / self.rate
+
+            self._paused_until = max(
+                self._paused_until, time.monotonic() + pause
+            )
+
+
+class RateLimiter:
+    buckets: Dict[Tuple[str, str], TokenBucket]
+
+    def __init__(self):
+        self.buckets = {}
+
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def endpoint_family(url: str) -> Tuple[str, str]:
+        parsed_url = urlparse(url)
+        path_segments = [segment for segment in parsed_url.path.split("/") if segment]
+
+        return parsed_url.netloc, path_segments[0] if path_segments else ""
+
+    @staticmethod
+    def retry_after(value: Optional[str]) -> Optional[float]:
+        if not value:
+            return None
+
+        try:
+            return max(0.0, float(value))
+
+        except ValueError:
+            pass
+
+        try:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+
+        except (TypeError, ValueError):
+            return None
+
+    def bucket(self, url: str, app_config: AppConfig, section: str) -> Optional[TokenBucket]:
+        host, family = self.endpoint_family(url)
+
+        with self._lock:
+            if (host, family) in self.buckets:
+                return self.buckets[(host, family)]
+
+            rate = app_config.get(
+                section,
+                f"rate_limit_{family}",
+                app_config.get(section, "rate_limit")
+            )
+
+            bucket = None
+
+            if rate:
+                bucket = TokenBucket(
+                    float(rate),
+                    float(app_config.get(section, "rate_limit_burst", rate)),
+                    min_rate=float(
+                        app_config.get(section, "rate_limit_min", 0.5)
+                    )
+                )
+
+            self.buckets[(host, family)] = bucket
+
+            return bucket
+
+
+# Shared by every client, so clients calling the same host share its buckets
+rate_limiter = RateLimiter()
@@ -7,16 +7,21 @@ from requests.exceptions import RequestException
 
 from app_config import AppConfig
 from app_logger import AppLogger
+from http_session import HttpSession
 from wix_data import FilterOperator, FulfillmentStatus, PaymentStatus, OrderFulfillment, OrderQueryFilter, OrderQuerySort
 
 
 class WixClient:
     app_config: AppConfig
     app_logger: AppLogger
+    session: HttpSession
 
     def __init__(self, app_config: AppConfig, app_logger: AppLogger):
         self.app_config = app_config
         self.app_logger = app_logger
+        self.session = HttpSession(app_config, "DEFAULT")
+
+        self._add_headers(self.session.headers)
 
     def _add_headers(self, headers: dict) -> None:
         headers["Authorization"] = self.app_config.get(
@@ -31,7 +36,7 @@ class WixClient:
 
     def _delete_request(self, url, headers) -> Response:
         try:
-            response = requests.delete(
+            response = self.session.delete(
                 url, headers=headers, timeout=10
             )
 
@@ -44,7 +49,7 @@ class WixClient:
 
     def _get_request(self, url, headers) -> Response:
         try:
-            response = requests.get(
+            response = self.session.get(
                 url, headers=headers, timeout=10
             )
 
@@ -57,7 +62,7 @@ class WixClient:
 
     def _post_request(self, url, headers, data) -> Response:
         try:
-            response = requests.post(
+            response = self.session.post(
                 url, headers=headers, json=data, timeout=10
             )
 
@@ -77,8 +82,6 @@ class WixClient:
             "Content-Type": "application/json"
         }
 
-        self._add_headers(headers)
-
         try:
             response = self._get_request(url, headers)
 
@@ -99,8 +102,6 @@ class WixClient:
             "Content-Type": "application/json"
         }
 
-        self._add_headers(headers)
-
         try:
             response = self._delete_request(url, headers)
 
@@ -125,17 +126,8 @@ class WixClient:
             "Content-Type": "application/json"
         }
 
-        self._add_headers(headers)
-
         data = {
-            "fulfillment": {
-                "lineItems": order_fulfillment.line_items,
-                "trackingInfo": {
-                    "shippingProvider": order_fulfillment.tracking_info_shipping_provider,
-                    "trackingNumber": order_fulfillment.tracking_info_tracking_number,
-                    "trackingLink": order_fulfillment.tracking_info_tracking_link
-                }
-            }
+            "fulfillment": order_fulfillment.to_dict()
         }
 
         try:
@@ -153,7 +145,7 @@ class WixClient:
         except RequestException as error:
             raise RequestException() from error
 
-    def post_stores_v2_orders_query(self, order_query_filter: OrderQueryFilter, order_query_sort: OrderQuerySort = OrderQuerySort.NUMBER_ASC) -> dict:
+    def post_stores_v2_orders_query(self, order_query_filter: OrderQueryFilter, order_query_sort: OrderQuerySort = OrderQuerySort.NUMBER_ASC, limit: int = 100, offset: int = 0) -> dict:
         base_url = self.app_config.get("DEFAULT", "base_url")
         url = f"{base_url}/stores/v2/orders/query"
 
@@ -162,52 +154,12 @@ class WixClient:
             "Content-Type": "application/json"
         }
 
-        self._add_headers(headers)
-
-        query_filter_dict = {}
-
-        if isinstance(order_query_filter.last_updated, dict):
-            last_updated_operator, last_updated_timestamp = list(
-                order_query_filter.last_updated.items()
-            )[0]
-
-            query_filter_dict["lastUpdated"] = {
-                last_updated_operator.value: last_updated_timestamp
-            }
-
-        if isinstance(order_query_filter.date_created, dict):
-            date_created_operator, date_created_timestamp = list(
-                order_query_filter.date_created.items()
-            )[0]
-
-            query_filter_dict["dateCreated"] = {
-                date_created_operator.value: date_created_timestamp
-            }
-
-        if isinstance(order_query_filter.number_list, list):
-            query_filter_dict["number"] = {
-                "$hasSome": order_query_filter.number_list
-            }
-
-        if isinstance(order_query_filter.read, bool):
-            query_filter_dict["read"] = str(order_query_filter.read).lower()
-
-        if isinstance(order_query_filter.archived, bool):
-            query_filter_dict["archived"] = str(
-                order_query_filter.archived
-            ).lower()
-
-        if isinstance(order_query_filter.payment_status, PaymentStatus):
-            query_filter_dict["paymentStatus"] = order_query_filter.payment_status.value
-
-        if isinstance(order_query_filter.fulfillment_status, FulfillmentStatus):
-            query_filter_dict["fulfillmentStatus"] = order_query_filter.fulfillment_status.value
-
         data = {
             "query": {
-                "filter": json.dumps(query_filter_dict),
+                "filter": json.dumps(order_query_filter.to_dict()),
                 "paging": {
-                    "limit": 100
+                    "limit": limit,
+                    "offset": offset
                 },
                 "sort": json.dumps([order_query_sort.value])
             }
@@ -47,7 +47,14 @@ class OrderFulfillment:
     line_items: list
 
     def to_dict(self):
-        pass
+        return {
+            "lineItems": self.line_items,
+            "trackingInfo": {
+                "shippingProvider": self.tracking_info_shipping_provider,
+                "trackingNumber": self.tracking_info_tracking_number,
+                "trackingLink": self.tracking_info_tracking_link
+            }
+        }
 
 
 @dataclass
@@ -61,4 +68,41 @@ class OrderQueryFilter:
     fulfillment_status: Optional[FulfillmentStatus] = None
 
     def to_dict(self):
-        pass
+        query_filter_dict = {}
+
+        if isinstance(self.last_updated, dict):
+            last_updated_operator, last_updated_timestamp = list(
+                self.last_updated.items()
+            )[0]
+
+            query_filter_dict["lastUpdated"] = {
+                last_updated_operator.value: last_updated_timestamp
+            }
+
+        if isinstance(self.date_created, dict):
+            date_created_operator, date_created_timestamp = list(
+                self.date_created.items()
+            )[0]
+
+            query_filter_dict["dateCreated"] = {
+                date_created_operator.value: date_created_timestamp
+            }
+
+        if isinstance(self.number_list, list):
+            query_filter_dict["number"] = {
+                "$hasSome": self.number_list
+            }
+
+        if isinstance(self.read, bool):
+            query_filter_dict["read"] = str(self.read).lower()
+
+        if isinstance(self.archived, bool):
+            query_filter_dict["archived"] = str(self.archived).lower()
+
+        if isinstance(self.payment_status, PaymentStatus):
+            query_filter_dict["paymentStatus"] = self.payment_status.value
+
+        if isinstance(self.fulfillment_status, FulfillmentStatus):
+            query_filter_dict["fulfillmentStatus"] = self.fulfillment_status.value
+
+        return query_filter_dict
@@ -0,0 +1,136 @@
+from typing import List, Optional
+
+
+class WixOrderAddress:
+    __slots__ = (
+        "first_name",
+        "last_name",
+        "street_name",
+        "street_number",
+        "address_line_2",
+        "zip_code",
+        "city",
+        "subdivision",
+        "phone",
+        "email",
+        "vat_id"
+    )
+
+    def __init__(self, address: dict):
+        full_name = address.get("fullName") or {}
+        street = address.get("street") or {}
+
+        self.first_name = full_name.get("firstName", "")
+        self.last_name = full_name.get("lastName", "")
+        self.street_name = street.get("name", "")
+        self.street_number = street.get("number", "")
+        self.address_line_2 = address.get("addressLine2", "")
+        self.zip_code = address.get("zipCode", "")
+        self.city = street.get("city", "")
+        self.subdivision = street.get("subdivision", "")
+        self.phone = address.get("phone", "")
+        self.email = address.get("email", "")
+        self.vat_id = (address.get("vatId") or {}).get("number", "")
+
+
+class WixOrderShippingInfo:
+    __slots__ = ("delivery_option", "shipment_details", "address")
+
+    def __init__(self, shipping_info: dict):
+        shipment_details = shipping_info.get("shipmentDetails") or {}
+
+        self.delivery_option = shipping_info.get("deliveryOption", "")
+        self.shipment_details = len(shipment_details) > 0
+        self.address = WixOrderAddress(shipment_details.get("address") or {})
+
+
+class WixOrderBillingInfo:
+    __slots__ = ("vat_id",)
+
+    def __init__(self, billing_info: dict):
+        self.vat_id = (billing_info.get("vatId") or {}).get("number", "")
+
+
+class WixOrderLineItem:
+    __slots__ = ("index", "product_id", "name", "quantity", "total_price")
+
+    def __init__(self, line_item: dict):
+        self.index = line_item.get("index")
+        self.product_id = line_item.get("productId")
+        self.name = line_item.get("name", "")
+        self.quantity = int(line_item.get("quantity", 0))
+        self.total_price = float(
+            (line_item.get("priceData") or {}).get("totalPrice", 0)
+        )
+
+
+class WixOrderTotals:
+    __slots__ = ("weight", "subtotal")
+
+    def __init__(self, totals: dict):
+        self.weight = float(totals.get("weight", 0))
+        self.subtotal = float(totals.get("subtotal", 0))
+
+
+class WixOrder:
+    __slots__ = (
+        "id",
+        "number",
+        "last_updated",
+        "tracking_number_list",
+        "_shipping_info",
+        "_billing_info",
+        "_line_items",
+        "_totals"
+    )
+
+    id: Optional[str]
+    number: str
+    last_updated: Optional[str]
+    tracking_number_list: List[str]
+
+    def __init__(self, order: dict):
+        self.id = order.get("id")
+        self.number = str(order.get("number", ""))
+        self.last_updated = order.get("lastUpdated")
+        self.tracking_number_list = [
+            fulfillment.get("trackingInfo", {}).get("trackingNumber")
+            for fulfillment in order.get("fulfillments", [])
+            if fulfillment.get("trackingInfo", {}).get("trackingNumber")
+        ]
+
+        # Only the sub-dicts are kept, each is decoded on first access
+        self._shipping_info = order.get("shippingInfo") or {}
+        self._billing_info = order.get("billingInfo") or {}
+        self._line_items = order.get("lineItems") or []
+        self._totals = order.get("totals") or {}
+
+    @property
+    def shipping_info(self) -> WixOrderShippingInfo:
+        if isinstance(self._shipping_info, dict):
+            self._shipping_info = WixOrderShippingInfo(self._shipping_info)
+
+        return self._shipping_info
+
+    @property
+    def billing_info(self) -> WixOrderBillingInfo:
+        if isinstance(self._billing_info, dict):
+            self._billing_info = WixOrderBillingInfo(self._billing_info)
+
+        return self._billing_info
+
+    @property
+    def line_items(self) -> List[WixOrderLineItem]:
+        if isinstance(self._line_items, list):
+            self._line_items = tuple(
+                WixOrderLineItem(line_item) for line_item in self._line_items
+            )
+
+        return self._line_items
+
+    @property
+    def totals(self) -> WixOrderTotals:
+        if isinstance(self._totals, dict):
+            self._totals = WixOrderTotals(self._totals)
+
+        return self._totals
@@ -1,51 +1,136 @@
-from typing import List, Optional
+from typing import Dict, Iterator, List, Optional
 
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import replace
 from itertools import compress
 
 import json
 import requests
+import threading
 
 from app_config import AppConfig
 from app_logger import AppLogger
+from async_wix_client import AsyncWixClient
 from wix_client import WixClient
 from wix_data import FilterOperator, FulfillmentStatus, PaymentStatus, OrderFulfillment, OrderQueryFilter, OrderQuerySort
+from wix_order import WixOrder
+from wix_order_snapshot import WixOrderSnapshot
+from wix_order_store import WixOrderStore
 
 
 class WixOrderHandler:
     app_config: AppConfig
     app_logger: AppLogger
+    async_wix_client: AsyncWixClient
     wix_client: WixClient
 
+    order_query_page_size: int
+    order_store: WixOrderStore
     order_query_response: Optional[dict] = None
     order_number_list_string: Optional[str] = None
 
+    order_by_id: Dict[str, dict]
+    order_by_number: Dict[str, dict]
+    order_by_tracking_number: Dict[str, dict]
+    order_position_by_id: Dict[str, int]
+
     def __init__(self, app_config: AppConfig, app_logger: AppLogger):
         self.app_config = app_config
+        self.order_by_id = {}
+        self.order_by_number = {}
+        self.order_by_tracking_number = {}
+        self.order_position_by_id = {}
+        self.order_query_page_size = int(
+            app_config.get("DEFAULT", "order_query_page_size", 100)
+        )
+        self.order_store = WixOrderStore(
+            WixOrderSnapshot(
+                app_config.get("DEFAULT", "order_snapshot_directory", "cache"),
+                keep=int(app_config.get("DEFAULT", "order_snapshot_keep", 3))
+            )
+        )
         self.wix_client = WixClient(app_config, app_logger)
+        self.async_wix_client = AsyncWixClient(app_config, app_logger)
+
+        # Guards the order list and its indexes, order_sync_background
+        # updates them from another thread
+        self.lock = threading.RLock()
 
     def get_data_collections(self):
         return self.wix_client.get_wix_data_v2_collections()
 
+    def _order_tracking_number_list(self, order: dict) -> List[str]:
+        return [
+            fulfillment.get("trackingInfo", {}).get("trackingNumber")
+            for fulfillment in order.get("fulfillments", [])
+            if fulfillment.get("trackingInfo", {}).get("trackingNumber")
+        ]
+
+    def _order_index_add(self, order: dict, position: int) -> None:
+        self.order_by_id[order.get("id")] = order
+        self.order_by_number[str(order.get("number"))] = order
+        self.order_position_by_id[order.get("id")] = position
+
+        for tracking_number in self._order_tracking_number_list(order):
+            self.order_by_tracking_number[tracking_number] = order
+
+    def _order_index_remove(self, order: dict) -> None:
+        self.order_by_id.pop(order.get("id"), None)
+        self.order_by_number.pop(str(order.get("number")), None)
+        self.order_position_by_id.pop(order.get("id"), None)
+
+        for tracking_number in self._order_tracking_number_list(order):
+            self.order_by_tracking_number.pop(tracking_number, None)
+
+    def _order_index_rebuild(self) -> None:
+        self.order_by_id = {}
+        self.order_by_number = {}
+        self.order_by_tracking_number = {}
+        self.order_position_by_id = {}
+
+        for position, order in enumerate(self.get_order_list()):
+            self._order_index_add(order, position)
+
     def get_order(self, order_number: str) -> dict:
-        try:
-            for order in self.order_query_response.get("orders"):
-                if str(order.get("number")) == order_number:
-                    return order
+        with self.lock:
+            return self.order_by_number.get(str(order_number))
+
+    def get_order_by_id(self, order_id: str) -> dict:
+        with self.lock:
+            return self.order_by_id.get(order_id)
+
+    def get_order_by_tracking_number(self, tracking_number: str) -> dict:
+        with self.lock:
+            return self.order_by_tracking_number.get(tracking_number)
 
-        except Exception:
-            return {}
+    # Models are built per call and not kept: the raw dicts stay the only
+    # per-order copy held here, Mongo replication and the store need them
+    def get_order_model(self, order_number: str) -> Optional[WixOrder]:
+        order = self.get_order(order_number)
+
+        return WixOrder(order) if order else None
+
+    def get_order_model_list(self) -> List[WixOrder]:
+        return [WixOrder(order) for order in self.get_order_list()]
 
     def get_order_list(self) -> List[dict]:
-        try:
-            return self.order_query_response.get("orders", [])
+        # A copy, so callers can iterate while a background sync merges
+        with self.lock:
+            try:
+                return list(self.order_query_response.get("orders", []))
 
-        except Exception:
-            return []
+            except Exception:
+                return []
 
     def get_order_list_total_results(self) -> int:
-        return self.order_query_response.get("totalResults", 0)
+        with self.lock:
+            return self.order_query_response.get("totalResults", 0)
 
     def get_order_number_list_string(self) -> str:
+        with self.lock:
+            return self._order_number_list_string()
+
+    def _order_number_list_string(self) -> str:
         if isinstance(self.order_number_list_string, str):
             return self.order_number_list_string
 
@@ -88,6 +173,12 @@ class WixOrderHandler:
             order_fulfillment
         )
 
+    async def order_fulfillment_create_async(self, order_id: str, order_fulfillment: OrderFulfillment) -> None:
+        await self.async_wix_client.post_stores_v2_orders_fulfillments(
+            order_id,
+            order_fulfillment
+        )
+
     def order_fulfillment_delete(self, order_id: str, fulfillment_id: str) -> None:
         self.wix_client.delete_stores_v2_orders_fulfillments(
             order_id,
@@ -95,6 +186,130 @@ class WixOrderHandler:
         )
 
     def order_query(self, order_query_filter: OrderQueryFilter, order_query_sort: OrderQuerySort) -> None:
-        self.order_query_response = self.wix_client.post_stores_v2_orders_query(
-            order_query_filter, order_query_sort
+        order_list = list(
+            self.order_query_iter(order_query_filter, order_query_sort)
+        )
+
+        with self.lock:
+            self.order_query_response = {
+                "orders": order_list,
+                "totalResults": len(order_list)
+            }
+            self.order_number_list_string = None
+
+            self._order_index_rebuild()
+
+    def order_list_merge(self, order_list: List[dict]) -> None:
+        with self.lock:
+            if self.order_query_response is None:
+                self.order_query_response = {"orders": [], "totalResults": 0}
+
+            orders = self.order_query_response["orders"]
+
+            # Refreshed orders replace the stale copy in place, new ones are appended
+            for order in order_list:
+                position = self.order_position_by_id.get(order.get("id"))
+
+                if position is None:
+                    position = len(orders)
+                    orders.append(order)
+                else:
+                    self._order_index_remove(orders[position])
+                    orders[position] = order
+
+                self._order_index_add(order, position)
+
+            self.order_query_response["totalResults"] = len(orders)
+            self.order_number_list_string = None
+
+    def order_query_iter(self, order_query_filter: OrderQueryFilter, order_query_sort: OrderQuerySort = OrderQuerySort.NUMBER_ASC) -> Iterator[dict]:
+        # One page is prefetched while the caller handles the current one
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            offset = 0
+
+            future = executor.submit(
+                self.wix_client.post_stores_v2_orders_query,
+                order_query_filter,
+                order_query_sort,
+                self.order_query_page_size,
+                offset
+            )
+
+            while future:
+                response = future.result()
+
+                order_list = response.get("orders", [])
+                total_results = response.get("totalResults", 0)
+
+                offset += len(order_list)
+
+                future = None
+
+                if len(order_list) > 0 and offset < total_results:
+                    future = executor.submit(
+                        self.wix_client.post_stores_v2_orders_query,
+                        order_query_filter,
+                        order_query_sort,
+                        self.order_query_page_size,
+                        offset
+                    )
+
+                yield from order_list
+
+    def order_sync(self, order_query_filter: Optional[OrderQueryFilter] = None) -> dict:
+        self.order_store.load()
+
+        if order_query_filter is None:
+            order_query_filter = OrderQueryFilter()
+
+        if self.order_store.watermark:
+            order_query_filter = replace(
+                order_query_filter,
+                last_updated={FilterOperator.GT: self.order_store.watermark}
+            )
+
+        order_list = list(self.order_query_iter(
+            order_query_filter, OrderQuerySort.LAST_UPDATED_ASC
+        ))
+
+        order_sync_result = self.order_store.merge(order_list)
+
+        # Loaded orders pick up their refreshed copy, new ones may not match
+        # the filter the current list was queried with
+        with self.lock:
+            if self.order_query_response is not None:
+                self.order_list_merge([
+                    order for order in order_list if order.get("id") in self.order_by_id
+                ])
+
+        self.order_store.save()
+
+        return order_sync_result
+
+    def order_sync_background(self, order_query_filter: Optional[OrderQueryFilter] = None) -> threading.Thread:
+        thread = threading.Thread(
+            target=self.order_sync, args=(order_query_filter,), daemon=True
         )
+        thread.start()
+
+        return thread
+
+    def order_snapshot_save(self) -> None:
+        self.order_store.load()
+        self.order_store.merge(self.get_order_list())
+        self.order_store.save()
+
+    def order_store_load(self, order_query_filter: Optional[OrderQueryFilter] = None) -> None:
+        # The history is only read by the commands that need it
+        self.order_store.load()
+
+        order_list = self.order_store.get_order_list(order_query_filter)
+
+        with self.lock:
+            self.order_query_response = {
+                "orders": order_list,
+                "totalResults": len(order_list)
+            }
+            self.order_number_list_string = None
+
+            self._order_index_rebuild()
@@ -0,0 +1,78 @@
+import glob
+import gzip
+import json
+import mmap
+import os
+import time
+
+from typing import List, Optional
+
+
+WIX_ORDER_SNAPSHOT_VERSION = 1
+
+
+class WixOrderSnapshot:
+    directory: str
+    prefix: str
+    keep: int
+
+    def __init__(self, directory: str, prefix: str = "wix_order_snapshot", keep: int = 3):
+        self.directory = directory
+        self.prefix = prefix
+        self.keep = keep
+
+    def path_list(self) -> List[str]:
+        # Millisecond timestamps have the same width, so names sort by age
+        return sorted(glob.glob(
+            os.path.join(self.directory, f"{self.prefix}-*.json.gz")
+        ))
+
+    def load(self) -> Optional[dict]:
+        path_list = self.path_list()
+
+        if len(path_list) == 0:
+            return None
+
+        with open(path_list[-1], "rb") as file:
+            if os.fstat(file.fileno()).st_size == 0:
+                return None
+
+            # Decompresses straight from the mapped pages, no copy of the file
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped_file:
+                with gzip.GzipFile(fileobj=mapped_file, mode="rb") as gzip_file:
+                    data = json.load(gzip_file)
+
+        if data.get("version") != WIX_ORDER_SNAPSHOT_VERSION:
+            return None
+
+        return data
+
+    def save(self, data: dict) -> str:
+        if not os.path.exists(self.directory):
+            os.makedirs(self.directory)
+
+        timestamp = time.time()
+
+        snapshot = {
+            "version": WIX_ORDER_SNAPSHOT_VERSION,
+            "timestamp": timestamp,
+            **data
+        }
+
+        path = os.path.join(
+            self.directory, f"{self.prefix}-{int(timestamp * 1000)}.json.gz"
+        )
+        temp_path = f"{path}.tmp"
+
+        with open(temp_path, "wb") as file:
+            file.write(gzip.compress(
+                json.dumps(snapshot, ensure_ascii=False, separators=(",", ":")).encode("utf-8"),
+                compresslevel=6
+            ))
+
+        os.replace(temp_path, path)
+
+        for old_path in self.path_list()[:-self.keep]:
+            os.remove(old_path)
+
+        return path
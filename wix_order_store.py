@@ -0,0 +1,120 @@
+import threading
+
+from typing import Dict, List, Optional
+
+from wix_data import OrderQueryFilter
+from wix_order_snapshot import WixOrderSnapshot
+
+
+class WixOrderStore:
+    snapshot: WixOrderSnapshot
+    timestamp: Optional[float]
+    watermark: Optional[str]
+    order_by_id: Dict[str, dict]
+    loaded: bool
+
+    def __init__(self, snapshot: WixOrderSnapshot):
+        self.snapshot = snapshot
+        self.timestamp = None
+        self.watermark = None
+        self.order_by_id = {}
+        self.loaded = False
+
+        self.lock = threading.RLock()
+
+    def load(self) -> None:
+        with self.lock:
+            if self.loaded:
+                return
+
+            data = self.snapshot.load()
+
+            # Only a successful read counts, save() must never drop history
+            self.loaded = True
+
+            if not data:
+                return
+
+            self.timestamp = data.get("timestamp")
+            self.watermark = data.get("watermark")
+            self.order_by_id = {
+                order.get("id"): order for order in data.get("orders", [])
+            }
+
+    def save(self) -> None:
+        with self.lock:
+            data = {
+                "watermark": self.watermark,
+                "orders": list(self.order_by_id.values())
+            }
+
+        self.snapshot.save(data)
+
+    def merge(self, order_list: List[dict]) -> dict:
+        added = []
+        changed = []
+
+        with self.lock:
+            for order in order_list:
+                existing_order = self.order_by_id.get(order.get("id"))
+
+                if not existing_order:
+                    added.append(order.get("number"))
+                elif existing_order.get("lastUpdated") != order.get("lastUpdated"):
+                    changed.append(order.get("number"))
+
+                self.order_by_id[order.get("id")] = order
+
+                # ISO 8601 timestamps in the same format compare as strings
+                if not self.watermark or order.get("lastUpdated", "") > self.watermark:
+                    self.watermark = order.get("lastUpdated")
+
+        return {
+            "added": added,
+            "changed": changed
+        }
+
+    @staticmethod
+    def _match(order: dict, query_filter_dict: dict) -> bool:
+        for field, condition in query_filter_dict.items():
+            value = order.get(field)
+
+            if not isinstance(condition, dict):
+                if str(value).lower() != str(condition).lower():
+                    return False
+
+                continue
+
+            for operator, operand in condition.items():
+                if operator == "$hasSome":
+                    if str(value) not in [str(item) for item in operand]:
+                        return False
+                elif value is None:
+                    return False
+                elif operator == "$eq" and value != operand:
+                    return False
+                elif operator == "$ne" and value == operand:
+                    return False
+                elif operator == "$lt" and not value < operand:
+                    return False
+                elif operator == "$lte" and not value <= operand:
+                    return False
+                elif operator == "$gt" and not value > operand:
+                    return False
+                elif operator == "$gte" and not value >= operand:
+                    return False
+
+        return True
+
+    def get_order_list(self, order_query_filter: Optional[OrderQueryFilter] = None) -> List[dict]:
+        with self.lock:
+            order_list = list(self.order_by_id.values())
+
+        if order_query_filter is None:
+            return order_list
+
+        query_filter_dict = order_query_filter.to_dict()
+
+        return [
+            order for order in order_list if self._match(order, query_filter_dict)
+        ]
@@ -5,20 +5,23 @@ from retrying import retry
 
 from app_config import AppConfig
 from app_logger import AppLogger
+from http_session import HttpSession
 
 
 class WsaClient:
     app_config: AppConfig
     app_logger: AppLogger
+    session: HttpSession
 
     def __init__(self, app_config: AppConfig, app_logger: AppLogger):
         self.app_config = app_config
         self.app_logger = app_logger
+        self.session = HttpSession(app_config, "DEFAULT")
 
     @retry(wait_fixed=600, stop_max_attempt_number=1)
     def _post_request(self, url, headers, data):
         try:
-            response = requests.post(
+            response = self.session.post(
                 url, headers=headers, json=data, timeout=300
             )
 
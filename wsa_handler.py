@@ -7,19 +7,46 @@ import requests
 
 from app_config import AppConfig
 from app_logger import AppLogger
+from async_wsa_client import AsyncWsaClient
+from label_renderer import LabelRenderer
 from wsa_client import WsaClient
 
 
 class WsaHandler:
     app_config: AppConfig
     app_logger: AppLogger
+    async_wsa_client: AsyncWsaClient
+    label_renderer: LabelRenderer
     wsa_client: WsaClient
 
+    enderecador_max_workers: int
+    enderecador_retries: int
+
     def __init__(self, app_config: AppConfig, app_logger: AppLogger):
         self.app_config = app_config
+        self.enderecador_max_workers = int(
+            app_config.get("DEFAULT", "enderecador_max_workers", 4)
+        )
+        self.enderecador_retries = int(
+            app_config.get("DEFAULT", "enderecador_retries", 1)
+        )
+        self.label_renderer = LabelRenderer(
+            app_config.get("DEFAULT", "label_font_path"),
+            dpi=int(app_config.get("DEFAULT", "label_dpi", 150)),
+            max_workers=int(app_config.get("DEFAULT", "label_max_workers", 4))
+        )
         self.wsa_client = WsaClient(app_config, app_logger)
+        self.async_wsa_client = AsyncWsaClient(app_config, app_logger)
 
     def correios_enderecador_encomendas(self, remetente_destinatario_list_dict: dict):
         return self.wsa_client.post_correios_enderecador_encomendas(
             remetente_destinatario_list_dict
         )
+
+    async def correios_enderecador_encomendas_async(self, remetente_destinatario_list_dict: dict):
+        return await self.async_wsa_client.post_correios_enderecador_encomendas(
+            remetente_destinatario_list_dict
+        )
+
+    def correios_enderecador_encomendas_local(self, grupo_list: List[dict], pdf_path: str) -> str:
+        return self.label_renderer.render(grupo_list, pdf_path)